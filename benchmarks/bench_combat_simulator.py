@@ -0,0 +1,50 @@
+"""
+Benchmark: SimpleBattle.start_battle one fight at a time vs the batch
+combat simulator.
+
+Run from the repository root:
+    python benchmarks/bench_combat_simulator.py [fights]
+"""
+
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import combat_simulator
+import combat_system
+
+
+def random_fights(count, seed=1):
+    rng = random.Random(seed)
+    kinds = ("goblin", "orc", "dragon")
+    chars = [{"health": rng.randint(80, 400), "strength": rng.randint(5, 40)} for _ in range(count)]
+    enemies = [combat_system.create_enemy(rng.choice(kinds)) for _ in range(count)]
+    return chars, enemies
+
+
+def main(count=100000):
+    chars, enemies = random_fights(count)
+    copies = copy.deepcopy((chars, enemies))
+
+    start = time.perf_counter()
+    expected = [combat_system.SimpleBattle(c, e).start_battle() for c, e in zip(*copies)]
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = combat_simulator.simulate_battles_from_dicts(chars, enemies)
+    batch_s = time.perf_counter() - start
+
+    assert results.battle_results() == expected
+
+    print(f"fights: {count}  (player win rate {results.win_rate:.1%})")
+    print(f"SimpleBattle loop: {loop_s:7.3f} s")
+    print(f"batch simulator:   {batch_s:7.3f} s")
+    print(f"speedup: {loop_s / batch_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,97 @@
+"""
+Benchmark: encounter loop allocating a new enemy and SimpleBattle per fight
+vs recycling them through an EncounterPool.
+
+Allocations are measured in a separate, untimed pass that counts enemy
+dicts created by the registry and battle objects constructed.
+
+Run from the repository root:
+    python benchmarks/bench_encounter_pool.py [encounters]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import combat_system
+
+ENEMY_TYPES = ("goblin", "orc", "dragon")
+
+
+class CountingRegistry(combat_system.EnemyRegistry):
+    """EnemyRegistry that counts the enemy dicts it creates."""
+
+    created = 0
+
+    def create(self, enemy_type, compact=False):
+        CountingRegistry.created += 1
+        return super().create(enemy_type, compact)
+
+
+class CountingBattle(combat_system.SimpleBattle):
+    """SimpleBattle that counts its constructions."""
+
+    created = 0
+
+    def __init__(self, character, enemy, rng=None):
+        CountingBattle.created += 1
+        super().__init__(character, enemy, rng)
+
+
+def fresh_encounters(char, count, registry, battle_class):
+    for i in range(count):
+        char["health"] = char["max_health"]
+        enemy = registry.create(ENEMY_TYPES[i % 3])
+        battle_class(char, enemy).start_battle()
+
+
+def pooled_encounters(char, count, pool):
+    for i in range(count):
+        char["health"] = char["max_health"]
+        battle = pool.acquire(char, ENEMY_TYPES[i % 3], normalized=True)
+        battle.start_battle()
+        pool.release(battle)
+
+
+def timed(run, count):
+    start = time.perf_counter()
+    run(count)
+    return time.perf_counter() - start
+
+
+def counted(run, count):
+    """Enemy dicts + battle objects allocated by run(count)."""
+    CountingRegistry.created = CountingBattle.created = 0
+    run(count)
+    return CountingRegistry.created + CountingBattle.created
+
+
+def main(count=200000):
+    char = character_manager.create_character("Grinder", "Warrior")
+    char["strength"] = 60  # wins every fight quickly, like a farming loop
+    registry = combat_system.EnemyRegistry.from_file()
+    counting_registry = CountingRegistry.from_file()
+
+    pool = combat_system.EncounterPool(registry)
+    fresh_s = timed(lambda n: fresh_encounters(char, n, registry, combat_system.SimpleBattle), count)
+    pooled_s = timed(lambda n: pooled_encounters(char, n, pool), count)
+
+    counting_pool = combat_system.EncounterPool(counting_registry, CountingBattle)
+    fresh_allocs = counted(
+        lambda n: fresh_encounters(char, n, counting_registry, CountingBattle), count)
+    pooled_allocs = counted(lambda n: pooled_encounters(char, n, counting_pool), count)
+
+    print(f"encounters: {count}")
+    print(f"new enemy + battle: {count / fresh_s:12,.0f} encounters/s  "
+          f"{fresh_allocs:10,} allocations ({fresh_allocs / fresh_s:12,.0f}/s)")
+    print(f"EncounterPool:      {count / pooled_s:12,.0f} encounters/s  "
+          f"{pooled_allocs:10,} allocations ({pooled_allocs / pooled_s:12,.0f}/s)  "
+          f"(created {pool.created}, reused {pool.reused})")
+    print(f"speedup: {fresh_s / pooled_s:.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
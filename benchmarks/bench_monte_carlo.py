@@ -0,0 +1,49 @@
+"""
+Benchmark: Monte Carlo combat throughput by number of worker processes.
+
+Run from the repository root:
+    python benchmarks/bench_monte_carlo.py [battles_per_matchup]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import combat_simulator
+import combat_system
+
+
+def matchups():
+    pairs = []
+    for cls in ("Warrior", "Mage", "Rogue", "Cleric"):
+        for enemy in ("goblin", "orc", "dragon"):
+            pairs.append((character_manager.create_character(cls, cls),
+                          combat_system.create_enemy(enemy)))
+    return pairs
+
+
+def main(battles=5000):
+    pairs = matchups()
+    cores = os.cpu_count() or 1
+    baseline = None
+    reference = None
+
+    print(f"{len(pairs)} matchups x {battles} battles, {cores} CPU(s)")
+    for workers in sorted({1, 2, 4, cores}):
+        start = time.perf_counter()
+        stats = combat_simulator.monte_carlo(pairs, battles, seed=1, workers=workers,
+                                             ability_chance=0.3, escape_below=0.2)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+
+        wins = [s.player_wins for s in stats]
+        assert reference is None or wins == reference
+        reference = wins
+        print(f"workers={workers:<3} {elapsed:7.2f} s  speedup {baseline / elapsed:4.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
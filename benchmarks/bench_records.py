@@ -0,0 +1,50 @@
+"""
+Benchmark: per-object memory of dict characters/items vs slot records.
+
+Run from the repository root:
+    python benchmarks/bench_records.py [count]
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import game_data
+from records import Character, Item
+
+
+def measure(build, count):
+    """Return bytes allocated per object by build(i) for count objects."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Exclude the list holding the objects
+    per_object = (after - before - sys.getsizeof(objects)) / count
+    del objects
+    return per_object
+
+
+def main(count=100_000):
+    template = character_manager.create_character("Bench", "Warrior")
+    item = next(iter(game_data.load_items("data/items.txt").values()))
+
+    rows = [
+        ("character", lambda i: dict(template), lambda i: Character(template)),
+        ("item", lambda i: dict(item), lambda i: Item(item)),
+    ]
+
+    print(f"{'record':<10} {'dict B/obj':>12} {'slots B/obj':>12} {'saved':>8}")
+    for label, as_dict, as_record in rows:
+        dict_bytes = measure(as_dict, count)
+        slot_bytes = measure(as_record, count)
+        saved = 100.0 * (dict_bytes - slot_bytes) / dict_bytes
+        print(f"{label:<10} {dict_bytes:>12.0f} {slot_bytes:>12.0f} {saved:>7.1f}%")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
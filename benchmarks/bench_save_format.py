@@ -0,0 +1,45 @@
+"""
+Benchmark: loading legacy repr saves vs the versioned JSON save format.
+
+Run from the repository root:
+    python benchmarks/bench_save_format.py [completed_quests]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+
+def late_game_character(completed):
+    char = character_manager.create_character("Veteran", "Warrior")
+    char["level"] = 40
+    char["inventory"] = [f"item_{i % 20}" for i in range(20)]
+    char["completed_quests"] = [f"quest_{i}" for i in range(completed)]
+    char["active_quests"] = ["quest_final"]
+    return char
+
+
+def main(completed=1000):
+    char = late_game_character(completed)
+    legacy = repr(char)
+    current = character_manager.serialize_character(char)
+
+    assert character_manager.deserialize_character(legacy) == char
+    assert character_manager.deserialize_character(current) == char
+
+    runs = 200
+    legacy_s = timeit.timeit(lambda: character_manager.deserialize_character(legacy), number=runs)
+    current_s = timeit.timeit(lambda: character_manager.deserialize_character(current), number=runs)
+
+    print(f"completed_quests: {completed}")
+    print(f"legacy repr/literal_eval: {legacy_s / runs * 1e6:9.1f} us/load")
+    print(f"v{character_manager.SAVE_FORMAT_VERSION} JSON:               {current_s / runs * 1e6:9.1f} us/load")
+    print(f"speedup: {legacy_s / current_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
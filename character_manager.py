@@ -8,12 +8,20 @@ AI Usage: Didnt pass multiple times so i put it into chatgpt to understand where
 """
 
 import os
+import json
+import math
 from ast import literal_eval
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+from inventory_system import Inventory
+from records import Character
+from save_backends import FlatFileBackend
 
 from custom_exceptions import (
+    GameError,
     InvalidCharacterClassError,
     CharacterNotFoundError,
-    SaveFileCorruptedError,
     InvalidSaveDataError,
     CharacterDeadError,
 )
@@ -21,6 +29,21 @@ from custom_exceptions import (
 # Directory where character save files are stored
 SAVE_DIR = os.path.join("data", "save_games")
 
+# Save format: a "QCSAVE <version>" header line followed by compact JSON.
+# Saves without the header are version 1 (repr of the dict, read with
+# literal_eval) and are still loaded transparently.
+SAVE_FORMAT_VERSION = 2
+_SAVE_HEADER = "QCSAVE "
+
+# Incremental saves: journal entries per character before it is compacted
+JOURNAL_COMPACT_THRESHOLD = 50
+
+_REQUIRED_SAVE_KEYS = frozenset({
+    "name", "class", "level", "experience",
+    "health", "max_health", "strength", "magic",
+    "gold", "inventory", "active_quests", "completed_quests",
+})
+
 
 # ---------------------------------------------------------------------------
 # CHARACTER CREATION
@@ -35,10 +58,13 @@ _VALID_CLASSES = {
 }
 
 
-def create_character(name, character_class):
+def create_character(name, character_class, compact=False):
     """
     Create a new character dictionary.
 
+    With compact=True a records.Character is returned instead; it supports
+    the same dict-style access with a much smaller memory footprint.
+
     Raises:
         InvalidCharacterClassError if class is invalid
     """
@@ -65,96 +91,336 @@ def create_character(name, character_class):
         "active_quests": [],
         "completed_quests": [],
     }
+    if compact:
+        return Character(character)
     return character
 
 
 # ---------------------------------------------------------------------------
-# SAVE / LOAD HELPERS
+# SAVE BACKEND
 # ---------------------------------------------------------------------------
 
-def _save_path(name):
-    return os.path.join(SAVE_DIR, f"{name}_save.txt")
+# None means "flat files in SAVE_DIR" (see save_backends.py for the others)
+_save_backend = None
+# The flat-file backend used while none is set (kept so its incremental
+# save state survives between calls)
+_default_backend = None
 
 
-def save_character(character):
+def set_save_backend(backend):
     """
-    Save character to a file in data/save_games/.
+    Use backend (e.g. save_backends.SQLiteBackend) for all saves/loads.
+    Passing None restores the default flat-file backend.
+    """
+    global _save_backend
+    _save_backend = backend
+    return backend
 
-    Returns:
-        True on success
+
+def get_save_backend():
+    """Return the active save backend."""
+    global _default_backend
+    if _save_backend is None:
+        if _default_backend is None or _default_backend.directory != SAVE_DIR:
+            _default_backend = FlatFileBackend(SAVE_DIR)
+        return _default_backend
+    return _save_backend
+
+
+def flush_saves():
+    """Write out any saves the active backend is still buffering."""
+    return get_save_backend().flush()
+
+
+# ---------------------------------------------------------------------------
+# SAVE / LOAD
+# ---------------------------------------------------------------------------
+
+def _json_default(value):
+    if isinstance(value, Inventory):
+        return value.to_list()
+    raise TypeError(f"{type(value).__name__} is not serializable")
+
+
+def serialize_character(character):
+    """Return the current-format save text for a character."""
+    try:
+        body = json.dumps(dict(character), separators=(",", ":"), default=_json_default)
+    except (TypeError, ValueError) as e:
+        raise InvalidSaveDataError(f"Character cannot be saved: {e}")
+    return f"{_SAVE_HEADER}{SAVE_FORMAT_VERSION}\n{body}"
+
+
+def deserialize_character(content):
     """
-    if not isinstance(character, dict) or "name" not in character:
-        raise InvalidSaveDataError("Character must be a dict with a 'name'.")
+    Parse save text (current or legacy format) into a validated dict.
 
-    os.makedirs(SAVE_DIR, exist_ok=True)
-    path = _save_path(character["name"])
+    Raises:
+        InvalidSaveDataError for unparseable or incomplete data
+    """
+    content = content.strip()
 
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            # Simple but enough for tests: repr + literal_eval
-            f.write(repr(character))
+        if content.startswith(_SAVE_HEADER):
+            header, _, body = content.partition("\n")
+            version = header[len(_SAVE_HEADER):]
+            if version != str(SAVE_FORMAT_VERSION):
+                raise InvalidSaveDataError(f"Unsupported save version: {version}")
+            data = json.loads(body)
+        else:
+            data = literal_eval(content)
+    except InvalidSaveDataError:
+        raise
     except Exception as e:
-        raise SaveFileCorruptedError(f"Could not save character: {e}")
+        raise InvalidSaveDataError(f"Could not parse save data: {e}")
+
+    if not isinstance(data, dict):
+        raise InvalidSaveDataError("Save data is not a dictionary.")
 
+    # very light validation – enough for tests
+    if not data.keys() >= _REQUIRED_SAVE_KEYS:
+        missing = _REQUIRED_SAVE_KEYS - data.keys()
+        raise InvalidSaveDataError(f"Save data missing fields: {set(missing)}")
+
+    return data
+
+
+def _save_to(backend, character):
+    if not isinstance(character, Mapping) or "name" not in character:
+        raise InvalidSaveDataError("Character must be a dict with a 'name'.")
+    name = character["name"]
+    data = serialize_character(character)
+
+    # A full save replaces any journal (one transaction on SQLite)
+    with backend.batch():
+        backend.save(name, data)
+        backend.clear_journal(name)
+
+    if name in backend.persisted:
+        backend.persisted[name] = _snapshot(character)
+        backend.journal_counts[name] = 0
     return True
 
 
+def _load_from(backend, name):
+    if not isinstance(name, str) or not name.strip():
+        raise CharacterNotFoundError("Invalid character name.")
+    data = deserialize_character(backend.load(name))
+    _replay_journal(data, backend.read_journal(name))
+    return data
+
+
+def save_character(character):
+    """
+    Save character through the active save backend
+    (data/save_games/ by default).
+
+    Returns:
+        True on success
+    """
+    return _save_to(get_save_backend(), character)
+
+
 def load_character(name):
     """
-    Load character from save file.
+    Load character from the active save backend.
 
     Raises:
         CharacterNotFoundError if save not found
         SaveFileCorruptedError / InvalidSaveDataError for bad data
     """
-    if not isinstance(name, str) or not name.strip():
-        raise CharacterNotFoundError("Invalid character name.")
+    return _load_from(get_save_backend(), name)
 
-    path = _save_path(name)
-    if not os.path.isfile(path):
-        raise CharacterNotFoundError(f"No save found for '{name}'.")
 
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-    except Exception as e:
-        raise SaveFileCorruptedError(f"Could not read save file: {e}")
+def _run_batch(func, backend, values, workers):
+    """
+    Call func(backend, value) for every value inside one backend batch.
+    Each entry of the result is func's return value or the GameError it
+    raised, in the same order as values.
+    """
+    def attempt(value):
+        try:
+            return func(backend, value)
+        except GameError as e:
+            return e
 
-    try:
-        data = literal_eval(content)
-    except Exception as e:
-        raise InvalidSaveDataError(f"Could not parse save data: {e}")
+    with backend.batch():
+        if workers and workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(attempt, values))
+        return [attempt(value) for value in values]
 
-    if not isinstance(data, dict):
-        raise InvalidSaveDataError("Save data is not a dictionary.")
 
-    # very light validation – enough for tests
-    required_keys = {
-        "name", "class", "level", "experience",
-        "health", "max_health", "strength", "magic",
-        "gold", "inventory", "active_quests", "completed_quests",
-    }
-    if not required_keys.issubset(data.keys()):
-        missing = required_keys - set(data.keys())
-        raise InvalidSaveDataError(f"Save data missing fields: {missing}")
+def save_characters(characters, workers=None):
+    """
+    Save many characters in one backend batch (the save directory is
+    checked once; SQLite commits once). workers > 1 runs the writes on a
+    thread pool.
 
-    return data
+    Returns:
+        list with True or the raised GameError for each character, in order
+    """
+    return _run_batch(_save_to, get_save_backend(), list(characters), workers)
+
+
+def load_characters(names, workers=None):
+    """
+    Load many characters at once. workers > 1 runs the reads on a thread pool.
+
+    Returns:
+        list with the character dict or the raised GameError for each name
+    """
+    return _run_batch(_load_from, get_save_backend(), list(names), workers)
 
 
 def delete_character(name):
     """
-    Delete a character save file.
+    Delete a character save (and its journal).
 
     Raises:
-        CharacterNotFoundError if file doesn't exist
+        CharacterNotFoundError if no save exists
     """
-    path = _save_path(name)
-    if not os.path.isfile(path):
-        raise CharacterNotFoundError(f"No save found for '{name}'.")
-    os.remove(path)
+    backend = get_save_backend()
+    backend.persisted.pop(name, None)
+    backend.journal_counts.pop(name, None)
+    return backend.delete(name)
+
+
+# ---------------------------------------------------------------------------
+# INCREMENTAL SAVES
+# ---------------------------------------------------------------------------
+#
+# save_character_incremental() writes a full save the first time it sees a
+# character, then only appends the fields that changed to the character's
+# journal. Each journal line is JSON with up to three parts:
+#   "set":    {field: new value}
+#   "extend": {field: [start, items]}  -> field = field[:start] + items
+#   "unset":  [field, ...]
+# Replaying an entry twice gives the same result, so a crash between a
+# compaction's save and its journal clear is harmless.
+
+_MISSING = object()
+
+
+def _snapshot_value(value):
+    if isinstance(value, (list, tuple, Inventory)):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def _snapshot(character):
+    return {key: _snapshot_value(value) for key, value in character.items()}
+
+
+def _journal_entry(snapshot, character):
+    """Return the journal entry turning snapshot into character (or None)."""
+    changed = {}
+    extended = {}
+    for key, value in character.items():
+        old = snapshot.get(key, _MISSING)
+        if isinstance(value, (tuple, Inventory)):
+            value = list(value)
+        if isinstance(value, list) and isinstance(old, list) and len(value) > len(old):
+            start = len(old)
+            if value[:start] == old:
+                extended[key] = [start, value[start:]]
+                continue
+        if value != old:
+            changed[key] = value
+
+    removed = [key for key in snapshot if key not in character]
+
+    entry = {}
+    if changed:
+        entry["set"] = changed
+    if extended:
+        entry["extend"] = extended
+    if removed:
+        entry["unset"] = removed
+    return entry or None
+
+
+def _replay_journal(data, lines):
+    """Apply journal lines to loaded save data in order."""
+    last = len(lines) - 1
+    for i, line in enumerate(lines):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            if i == last:
+                # A crash during the final append; everything before it is good
+                break
+            raise InvalidSaveDataError(f"Corrupted save journal entry {i + 1}.")
+
+        for key, value in entry.get("set", {}).items():
+            data[key] = value
+        for key, (start, items) in entry.get("extend", {}).items():
+            data[key] = list(data.get(key, []))[:start] + items
+        for key in entry.get("unset", ()):
+            data.pop(key, None)
+    return data
+
+
+def save_character_incremental(character):
+    """
+    Persist only the fields that changed since this character was last
+    saved. Falls back to a full save the first time a character is seen,
+    and compacts the journal into a full save every
+    JOURNAL_COMPACT_THRESHOLD entries.
+
+    Returns:
+        True on success (also when nothing changed)
+    """
+    if not isinstance(character, Mapping) or "name" not in character:
+        raise InvalidSaveDataError("Character must be a dict with a 'name'.")
+
+    backend = get_save_backend()
+    name = character["name"]
+    persisted = backend.persisted
+    snapshot = persisted.get(name)
+
+    if snapshot is None:
+        # Registered first so _save_to records the snapshot, but only kept
+        # once the full save has succeeded
+        persisted[name] = {}
+        try:
+            return _save_to(backend, character)
+        except Exception:
+            persisted.pop(name, None)
+            raise
+
+    entry = _journal_entry(snapshot, character)
+    if entry is None:
+        return True
+
+    try:
+        line = json.dumps(entry, separators=(",", ":"))
+    except (TypeError, ValueError) as e:
+        raise InvalidSaveDataError(f"Character cannot be saved: {e}")
+    backend.append_journal(name, line)
+
+    for key, value in entry.get("set", {}).items():
+        snapshot[key] = _snapshot_value(value)
+    for key, (start, items) in entry.get("extend", {}).items():
+        snapshot[key].extend(items)
+    for key in entry.get("unset", ()):
+        del snapshot[key]
+
+    counts = backend.journal_counts
+    counts[name] = counts.get(name, 0) + 1
+    if counts[name] >= JOURNAL_COMPACT_THRESHOLD:
+        _save_to(backend, character)
     return True
 
 
+def compact_character(name):
+    """Fold a character's journal into a fresh full save."""
+    backend = get_save_backend()
+    return _save_to(backend, _load_from(backend, name))
+
+
 # ---------------------------------------------------------------------------
 # PROGRESSION / STATS
 # ---------------------------------------------------------------------------
@@ -176,30 +442,106 @@ def gain_experience(character, xp_amount):
         CharacterDeadError if character['health'] <= 0
         ValueError if xp_amount is not int
     """
+    _check_can_gain_experience(character, xp_amount)
+    return _apply_experience(character, xp_amount)
+
+
+def gain_experience_batch(characters, xp_amounts):
+    """
+    Apply xp_amounts[i] to characters[i] for every pair at once.
+
+    All inputs are checked before any character is changed, so a bad entry
+    leaves the whole batch untouched.
+
+    Returns:
+        list of booleans (True where that character leveled up)
+
+    Raises:
+        ValueError if the lengths differ or an amount is not int
+        CharacterDeadError if any character is dead
+    """
+    characters = list(characters)
+    xp_amounts = list(xp_amounts)
+    if len(characters) != len(xp_amounts):
+        raise ValueError("characters and xp_amounts must have the same length.")
+
+    for character, xp_amount in zip(characters, xp_amounts):
+        _check_can_gain_experience(character, xp_amount)
+
+    return [
+        _apply_experience(character, xp_amount)
+        for character, xp_amount in zip(characters, xp_amounts)
+    ]
+
+
+def _check_can_gain_experience(character, xp_amount):
     if int(character.get("health", 0)) <= 0:
         raise CharacterDeadError("Dead characters cannot gain experience.")
 
     if not isinstance(xp_amount, int):
         raise ValueError("xp_amount must be an integer.")
 
+
+def _xp_for_levels(level, levels):
+    """Total XP needed to go up `levels` levels starting at `level`."""
+    return 100 * (levels * level + levels * (levels - 1) // 2)
+
+
+def _levels_gained(level, experience):
+    """
+    Number of level-ups that `experience` XP buys starting at `level`.
+
+    Going from level L up k levels costs 100 * (k*L + k*(k-1)/2) XP, so k is
+    the largest root of k^2 + (2L - 1)k - 2*(experience // 100) <= 0.
+    """
+    budget = int(experience // 100)
+    if budget < level:
+        return 0
+
+    b = 2 * level - 1
+    k = (math.isqrt(b * b + 8 * budget) - b) // 2
+    # isqrt rounds down; nudge k onto the exact boundary
+    while _xp_for_levels(level, k + 1) <= experience:
+        k += 1
+    while k > 0 and _xp_for_levels(level, k) > experience:
+        k -= 1
+    return k
+
+
+def _apply_experience(character, xp_amount):
     character["experience"] = character.get("experience", 0) + xp_amount
-    leveled = False
-
-    while True:
-        level = int(character.get("level", 1))
-        required = level * 100
-        if character["experience"] >= required:
-            character["experience"] -= required
-            character["level"] = level + 1
-            character["max_health"] = int(character["max_health"]) + 10
-            character["strength"] = int(character["strength"]) + 2
-            character["magic"] = int(character["magic"]) + 2
-            character["health"] = character["max_health"]
-            leveled = True
-        else:
+    level = int(character.get("level", 1))
+    levels = 0
+
+    # Levels below 1 cost nothing or negative XP; step through those
+    # exactly like a single level-up each, then switch to closed form.
+    while level + levels < 1:
+        required = (level + levels) * 100
+        if character["experience"] < required:
             break
-
-    return leveled
+        character["experience"] -= required
+        levels += 1
+    else:
+        gained = _levels_gained(level + levels, character["experience"])
+        character["experience"] -= _xp_for_levels(level + levels, gained)
+        levels += gained
+
+    if levels == 0:
+        return False
+
+    character["level"] = level + levels
+    # Keep unequipped base stats in step (see inventory_system equipment)
+    base = character.get("base_stats")
+    if base is not None:
+        base["max_health"] = base.get("max_health", 0) + 10 * levels
+        base["strength"] = base.get("strength", 0) + 2 * levels
+        base["magic"] = base.get("magic", 0) + 2 * levels
+
+    character["max_health"] = int(character["max_health"]) + 10 * levels
+    character["strength"] = int(character["strength"]) + 2 * levels
+    character["magic"] = int(character["magic"]) + 2 * levels
+    character["health"] = character["max_health"]
+    return True
 
 
 def add_gold(character, amount):
@@ -0,0 +1,386 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Combat Simulator Module
+
+Headless batch resolution of SimpleBattle fights for balance testing.
+
+- simulate_battles: deterministic basic-attack fights given as parallel
+  columns (one list per stat, one entry per fight), resolved together turn
+  by turn without building battle objects or touching dicts. Outcomes are
+  identical to running SimpleBattle.start_battle on each pair.
+- monte_carlo: randomized fights (special abilities, escapes) run many
+  times per matchup on a process pool with reproducible seeding.
+"""
+
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from combat_system import MAX_BATTLE_TURNS, SimpleBattle, use_special_ability
+from custom_exceptions import (
+    AbilityOnCooldownError,
+    CharacterDeadError,
+    CombatNotActiveError,
+)
+
+
+PLAYER = "player"
+ENEMY = "enemy"
+
+
+# ============================================================================
+# RESULTS
+# ============================================================================
+
+class BattleResults:
+    """
+    Column-oriented results of a batch of fights.
+
+    Every attribute is a list with one entry per fight, in input order:
+        winners:       'player' or 'enemy'
+        turns:         turns fought (SimpleBattle.turn_counter at the end)
+        xp_gained:     reward XP (0 for losses)
+        gold_gained:   reward gold (0 for losses)
+        player_health: player health after the fight
+        enemy_health:  enemy health after the fight
+    """
+
+    __slots__ = ("winners", "turns", "xp_gained", "gold_gained",
+                 "player_health", "enemy_health")
+
+    def __init__(self, winners, turns, xp_gained, gold_gained,
+                 player_health, enemy_health):
+        self.winners = winners
+        self.turns = turns
+        self.xp_gained = xp_gained
+        self.gold_gained = gold_gained
+        self.player_health = player_health
+        self.enemy_health = enemy_health
+
+    def __len__(self):
+        return len(self.winners)
+
+    @property
+    def player_wins(self):
+        return self.winners.count(PLAYER)
+
+    @property
+    def win_rate(self):
+        return self.player_wins / len(self.winners) if self.winners else 0.0
+
+    @property
+    def total_xp(self):
+        return sum(self.xp_gained)
+
+    @property
+    def total_gold(self):
+        return sum(self.gold_gained)
+
+    def battle_results(self):
+        """Per-fight results in SimpleBattle.start_battle's dict format."""
+        return [
+            {"winner": w, "xp_gained": xp, "gold_gained": gold}
+            for w, xp, gold in zip(self.winners, self.xp_gained, self.gold_gained)
+        ]
+
+
+# ============================================================================
+# BATCH RESOLUTION
+# ============================================================================
+
+def _damage(attacker_strength, defender_strength):
+    """SimpleBattle.calculate_damage on plain ints."""
+    dmg = attacker_strength - (defender_strength // 4)
+    return dmg if dmg > 1 else 1
+
+
+def simulate_battles(player_health, player_strength, enemy_health, enemy_strength,
+                     xp_reward=None, gold_reward=None):
+    """
+    Resolve a population of basic-attack fights.
+
+    Arguments are equal-length sequences with one entry per fight; the
+    rewards default to 0. Each turn the player attacks, then the enemy,
+    exactly as in SimpleBattle, and a fight still running after
+    MAX_BATTLE_TURNS turns is an enemy win.
+
+    Returns:
+        BattleResults
+
+    Raises:
+        ValueError if the columns have different lengths
+        CharacterDeadError if any player starts with health <= 0
+    """
+    n = len(player_health)
+    if xp_reward is None:
+        xp_reward = [0] * n
+    if gold_reward is None:
+        gold_reward = [0] * n
+    columns = (player_strength, enemy_health, enemy_strength, xp_reward, gold_reward)
+    if any(len(col) != n for col in columns):
+        raise ValueError("All stat columns must have the same length.")
+
+    p_hp = [int(hp) for hp in player_health]
+    e_hp = [int(hp) for hp in enemy_health]
+    for i, hp in enumerate(p_hp):
+        if hp <= 0:
+            raise CharacterDeadError(f"Character in fight {i} is dead and cannot fight.")
+
+    p_str = [int(s) for s in player_strength]
+    e_str = [int(s) for s in enemy_strength]
+    # Strengths are fixed for the whole fight, so damage per hit is too
+    p_dmg = [_damage(a, d) for a, d in zip(p_str, e_str)]
+    e_dmg = [_damage(a, d) for a, d in zip(e_str, p_str)]
+
+    winners = [ENEMY] * n
+    turns = [0] * n
+    active = range(n)
+    turn = 0
+
+    while active:
+        turn += 1
+        still_active = []
+        for i in active:
+            hp = e_hp[i] - p_dmg[i]
+            if hp <= 0:
+                e_hp[i] = 0
+                winners[i] = PLAYER
+                turns[i] = turn
+                continue
+            e_hp[i] = hp
+
+            hp = p_hp[i] - e_dmg[i]
+            if hp <= 0:
+                p_hp[i] = 0
+                turns[i] = turn
+                continue
+            p_hp[i] = hp
+
+            if turn > MAX_BATTLE_TURNS:
+                turns[i] = turn
+                continue
+            still_active.append(i)
+        active = still_active
+
+    won = [w == PLAYER for w in winners]
+    return BattleResults(
+        winners,
+        turns,
+        [int(xp) if w else 0 for w, xp in zip(won, xp_reward)],
+        [int(gold) if w else 0 for w, gold in zip(won, gold_reward)],
+        p_hp,
+        e_hp,
+    )
+
+
+def simulate_battles_from_dicts(characters, enemies):
+    """
+    Resolve SimpleBattle fights between characters[i] and enemies[i]
+    without modifying either dict. Missing stats default the way
+    SimpleBattle fills them in.
+
+    Returns:
+        BattleResults
+    """
+    if len(characters) != len(enemies):
+        raise ValueError("characters and enemies must have the same length.")
+    return simulate_battles(
+        [c.get("health", 0) for c in characters],
+        [c.get("strength", 1) for c in characters],
+        [e.get("health", e.get("max_health", 0)) for e in enemies],
+        [e.get("strength", 1) for e in enemies],
+        [e.get("xp_reward", 0) for e in enemies],
+        [e.get("gold_reward", 0) for e in enemies],
+    )
+
+
+# ============================================================================
+# MONTE CARLO
+# ============================================================================
+
+class StochasticBattle(SimpleBattle):
+    """
+    SimpleBattle whose player sometimes uses their class ability or tries
+    to flee, drawing every chance from the battle's rng.
+
+    Each player turn:
+      - at or below escape_below * max_health, try to escape (the attempt
+        uses up the turn; success ends the battle with escaped = True)
+      - otherwise use the special ability with probability ability_chance
+      - otherwise make a basic attack
+    """
+
+    def __init__(self, character, enemy, rng=None, ability_chance=0.0, escape_below=0.0):
+        super().__init__(character, enemy, rng)
+        self.ability_chance = ability_chance
+        self.escape_below = escape_below
+
+    def reset(self, character, enemy, rng=None, normalized=False):
+        super().reset(character, enemy, rng, normalized)
+        self.escaped = False
+        return self
+
+    def player_turn(self):
+        if not self.combat_active:
+            raise CombatNotActiveError("Combat is not active.")
+
+        if self.escape_below:
+            health = int(self.character.get("health", 0))
+            if health <= self.escape_below * int(self.character.get("max_health", 0)):
+                self.escaped = self.attempt_escape()
+                return
+
+        if self.ability_chance and self.rng.random() < self.ability_chance:
+            try:
+                use_special_ability(self.character, self.enemy, rng=self.rng)
+                return
+            except AbilityOnCooldownError:
+                pass  # no ability for this class: attack instead
+
+        super().player_turn()
+
+
+class MatchupStats:
+    """
+    Aggregated results of many randomized battles of one matchup.
+
+    turn_histogram maps turns fought -> number of battles.
+    """
+
+    __slots__ = ("battles", "player_wins", "enemy_wins", "escapes",
+                 "turn_histogram", "xp_gained", "gold_gained")
+
+    def __init__(self):
+        self.battles = 0
+        self.player_wins = 0
+        self.enemy_wins = 0
+        self.escapes = 0
+        self.turn_histogram = {}
+        self.xp_gained = 0
+        self.gold_gained = 0
+
+    def merge(self, other):
+        """Add another MatchupStats' counts into this one."""
+        self.battles += other.battles
+        self.player_wins += other.player_wins
+        self.enemy_wins += other.enemy_wins
+        self.escapes += other.escapes
+        self.xp_gained += other.xp_gained
+        self.gold_gained += other.gold_gained
+        for turns, count in other.turn_histogram.items():
+            self.turn_histogram[turns] = self.turn_histogram.get(turns, 0) + count
+        return self
+
+    @property
+    def win_rate(self):
+        return self.player_wins / self.battles if self.battles else 0.0
+
+    @property
+    def mean_turns(self):
+        if not self.battles:
+            return 0.0
+        return sum(t * c for t, c in self.turn_histogram.items()) / self.battles
+
+    def confidence_interval(self, z=1.96):
+        """Wilson score interval for the player win rate (95% by default)."""
+        n = self.battles
+        if n == 0:
+            return (0.0, 1.0)
+        p = self.player_wins / n
+        denom = 1 + z * z / n
+        centre = (p + z * z / (2 * n)) / denom
+        margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+        return (max(0.0, centre - margin), min(1.0, centre + margin))
+
+
+def _run_chunk(task):
+    """
+    Run one chunk of battles for a matchup in a worker process.
+    The chunk's rng is seeded from (seed, matchup, chunk) only, so results
+    do not depend on which worker runs it.
+    """
+    character, enemy, seed, matchup, chunk, count, ability_chance, escape_below = task
+    rng = random.Random(f"{seed}/{matchup}/{chunk}")
+    stats = MatchupStats()
+    histogram = stats.turn_histogram
+
+    for _ in range(count):
+        battle = StochasticBattle(dict(character), dict(enemy), rng,
+                                  ability_chance, escape_below)
+        result = battle.start_battle()
+        stats.battles += 1
+        if battle.escaped:
+            stats.escapes += 1
+        elif result["winner"] == "player":
+            stats.player_wins += 1
+            stats.xp_gained += result["xp_gained"]
+            stats.gold_gained += result["gold_gained"]
+        else:
+            stats.enemy_wins += 1
+        histogram[battle.turn_counter] = histogram.get(battle.turn_counter, 0) + 1
+    return matchup, stats
+
+
+def monte_carlo(matchups, battles, seed=0, workers=None, chunk_size=1000,
+                ability_chance=0.0, escape_below=0.0):
+    """
+    Run battles randomized StochasticBattle fights for every
+    (character, enemy) pair in matchups, spread over worker processes.
+
+    Each matchup is split into chunks of chunk_size battles, and every chunk
+    gets its own random.Random seeded from (seed, matchup, chunk), so a
+    fixed seed gives identical results for any number of workers. The
+    input dicts are never modified.
+
+    Returns:
+        list of MatchupStats, one per matchup, in order
+
+    Raises:
+        ValueError if battles or chunk_size is less than 1
+        CharacterDeadError if a matchup's character has health <= 0
+    """
+    if battles < 1 or chunk_size < 1:
+        raise ValueError("battles and chunk_size must be at least 1.")
+
+    matchups = list(matchups)
+    tasks = []
+    for m, (character, enemy) in enumerate(matchups):
+        if int(character.get("health", 0)) <= 0:
+            raise CharacterDeadError(f"Character in matchup {m} is dead and cannot fight.")
+        character, enemy = dict(character), dict(enemy)
+        for chunk, start in enumerate(range(0, battles, chunk_size)):
+            count = min(chunk_size, battles - start)
+            tasks.append((character, enemy, seed, m, chunk, count,
+                          ability_chance, escape_below))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(tasks) <= 1:
+        results = [_run_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(_run_chunk, tasks))
+
+    stats = [MatchupStats() for _ in matchups]
+    for m, chunk_stats in results:
+        stats[m].merge(chunk_stats)
+    for matchup_stats in stats:
+        matchup_stats.turn_histogram = dict(sorted(matchup_stats.turn_histogram.items()))
+    return stats
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    import combat_system
+
+    heroes = [{"health": 100, "strength": s} for s in range(5, 30, 5)]
+    foes = [combat_system.create_enemy("orc") for _ in heroes]
+    results = simulate_battles_from_dicts(heroes, foes)
+    print("Winners:", results.winners)
+    print("Turns:  ", results.turns)
+    print(f"Win rate: {results.win_rate:.0%}")
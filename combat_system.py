@@ -11,9 +11,15 @@ Handles combat mechanics.
 """
 
 import random
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from types import MappingProxyType
 
+import game_data
+from records import Enemy
 from custom_exceptions import (
     InvalidTargetError,
+    MissingDataFileError,
     CombatNotActiveError,
     CharacterDeadError,
     AbilityOnCooldownError,
@@ -23,11 +29,152 @@ from custom_exceptions import (
 # ENEMY DEFINITIONS
 # ============================================================================
 
-def create_enemy(enemy_type):
+# Used when no enemies file is available (same stats as data/enemies.txt)
+DEFAULT_ENEMIES = game_data.DEFAULT_ENEMIES
+
+
+class EnemyRegistry:
+    """
+    Enemy templates by type, plus level bands for picking encounters.
+
+    Each template is built once in create_enemy's format and only handed
+    out read-only, so creating an enemy is a single shallow dict copy. Every enemy
+    type's min_level starts a level band: a character meets the enemies of
+    the highest band whose min_level is <= their level (the lowest band
+    below that). Band lookup is a bisect over the sorted min levels.
+    """
+
+    def __init__(self, enemies=()):
+        self._templates = {}
+        self._min_levels = []  # sorted band start levels
+        self._bands = []       # enemy types of each band, in add order
+        for enemy in enemies:
+            self.add(enemy)
+
+    @classmethod
+    def from_file(cls, filename=game_data.ENEMIES_PATH_DEFAULT):
+        """Build a registry from an enemies data file (see game_data.load_enemies)."""
+        return cls(game_data.load_enemies(filename).values())
+
+    def add(self, enemy):
+        """Add (or replace) an enemy type from a game_data enemy dict."""
+        enemy_type = enemy["enemy_id"].lower()
+        if enemy_type in self._templates:
+            self._remove_from_band(enemy_type)
+        self._templates[enemy_type] = {
+            "name": enemy["name"],
+            "health": enemy["health"],
+            "max_health": enemy["health"],
+            "strength": enemy["strength"],
+            "magic": enemy.get("magic", 0),
+            "xp_reward": enemy.get("xp_reward", 0),
+            "gold_reward": enemy.get("gold_reward", 0),
+        }
+
+        min_level = enemy.get("min_level", 1)
+        pos = bisect_left(self._min_levels, min_level)
+        if pos < len(self._min_levels) and self._min_levels[pos] == min_level:
+            self._bands[pos].append(enemy_type)
+        else:
+            self._min_levels.insert(pos, min_level)
+            self._bands.insert(pos, [enemy_type])
+
+    def _remove_from_band(self, enemy_type):
+        for pos, band in enumerate(self._bands):
+            if enemy_type in band:
+                band.remove(enemy_type)
+                if not band:
+                    del self._bands[pos]
+                    del self._min_levels[pos]
+                return
+
+    def __contains__(self, enemy_type):
+        return isinstance(enemy_type, str) and enemy_type.lower() in self._templates
+
+    def __iter__(self):
+        return iter(self._templates)
+
+    def __len__(self):
+        return len(self._templates)
+
+    def lookup(self, enemy_type):
+        """
+        Return (normalized type, template dict) for enemy_type. The dict is
+        the registry's own template: read or copy it, never modify it.
+
+        Raises:
+            InvalidTargetError if enemy_type not recognized
+        """
+        if not isinstance(enemy_type, str):
+            raise InvalidTargetError("Enemy type must be a string.")
+        key = enemy_type.lower()
+        try:
+            return key, self._templates[key]
+        except KeyError:
+            raise InvalidTargetError(f"Unknown enemy type: {enemy_type}") from None
+
+    def template(self, enemy_type):
+        """Read-only template for enemy_type (InvalidTargetError if unknown)."""
+        return MappingProxyType(self.lookup(enemy_type)[1])
+
+    def create(self, enemy_type, compact=False):
+        """New enemy of enemy_type: a dict, or a records.Enemy if compact."""
+        template = self.lookup(enemy_type)[1]
+        if compact:
+            return Enemy(template)
+        return template.copy()
+
+    def types_for_level(self, level):
+        """Enemy types of the band that level falls in."""
+        if not self._bands:
+            raise InvalidTargetError("No enemy types are registered.")
+        pos = bisect_right(self._min_levels, level) - 1
+        return self._bands[max(pos, 0)]
+
+    def type_for_level(self, level, rng=None):
+        """
+        Pick an enemy type for level. Bands with several types choose one
+        with rng (global random by default).
+        """
+        band = self.types_for_level(level)
+        if len(band) == 1:
+            return band[0]
+        return (rng or random).choice(band)
+
+
+_enemy_registry = None
+
+
+def set_enemy_registry(registry):
+    """
+    Use registry for create_enemy and get_random_enemy_for_level
+    (None goes back to the default). Returns the registry.
+    """
+    global _enemy_registry
+    _enemy_registry = registry
+    return registry
+
+
+def get_enemy_registry():
+    """
+    Return the active EnemyRegistry, loading data/enemies.txt on first use
+    (or the built-in DEFAULT_ENEMIES if that file does not exist).
+    """
+    global _enemy_registry
+    if _enemy_registry is None:
+        try:
+            _enemy_registry = EnemyRegistry.from_file()
+        except MissingDataFileError:
+            _enemy_registry = EnemyRegistry(DEFAULT_ENEMIES)
+    return _enemy_registry
+
+
+def create_enemy(enemy_type, compact=False):
     """
     Create an enemy based on type.
 
-    Valid enemy types and stats:
+    Enemy types and their stats come from the enemy registry (by default
+    data/enemies.txt), e.g.:
     - goblin: health=50, strength=8, magic=2, xp_reward=25, gold_reward=10
     - orc:    health=80, strength=12, magic=5, xp_reward=50, gold_reward=25
     - dragon: health=200, strength=25, magic=15, xp_reward=200, gold_reward=100
@@ -35,54 +182,19 @@ def create_enemy(enemy_type):
     Returns:
         dict with keys:
         name, health, max_health, strength, magic, xp_reward, gold_reward
+        (a records.Enemy with the same keys when compact=True)
 
     Raises:
         InvalidTargetError if enemy_type not recognized
     """
-    if not isinstance(enemy_type, str):
-        raise InvalidTargetError("Enemy type must be a string.")
-
-    et = enemy_type.lower()
-
-    if et == "goblin":
-        return {
-            "name": "Goblin",
-            "health": 50,
-            "max_health": 50,
-            "strength": 8,
-            "magic": 2,
-            "xp_reward": 25,
-            "gold_reward": 10,
-        }
-    elif et == "orc":
-        return {
-            "name": "Orc",
-            "health": 80,
-            "max_health": 80,
-            "strength": 12,
-            "magic": 5,
-            "xp_reward": 50,
-            "gold_reward": 25,
-        }
-    elif et == "dragon":
-        return {
-            "name": "Dragon",
-            "health": 200,
-            "max_health": 200,
-            "strength": 25,
-            "magic": 15,
-            "xp_reward": 200,
-            "gold_reward": 100,
-        }
-    else:
-        # This is what test_exception_handling expects
-        raise InvalidTargetError(f"Unknown enemy type: {enemy_type}")
+    return get_enemy_registry().create(enemy_type, compact)
 
 
-def get_random_enemy_for_level(character_level):
+def get_random_enemy_for_level(character_level, rng=None):
     """
     Get an appropriate enemy for character's level.
 
+    The registry's level bands decide the enemy; with the default data:
     Level 1-2: Goblins
     Level 3-5: Orcs
     Level 6+:  Dragons
@@ -95,18 +207,17 @@ def get_random_enemy_for_level(character_level):
     except Exception:
         lvl = 1
 
-    if lvl <= 2:
-        return create_enemy("goblin")
-    elif 3 <= lvl <= 5:
-        return create_enemy("orc")
-    else:
-        return create_enemy("dragon")
+    registry = get_enemy_registry()
+    return registry.create(registry.type_for_level(lvl, rng))
 
 
 # ============================================================================
 # COMBAT SYSTEM
 # ============================================================================
 
+# A battle still running after this many turns is scored as an enemy win
+MAX_BATTLE_TURNS = 500
+
 class SimpleBattle:
     """
     Simple turn-based combat system.
@@ -118,26 +229,47 @@ class SimpleBattle:
       - that player_turn raises CombatNotActiveError when combat_active is False
     """
 
-    def __init__(self, character, enemy):
-        """Initialize battle with character and enemy."""
+    def __init__(self, character, enemy, rng=None):
+        """
+        Initialize battle with character and enemy.
+
+        rng is the random source for chance-based actions (a random.Random,
+        for reproducible battles); the global random module by default.
+        """
+        self.reset(character, enemy, rng)
+
+    def reset(self, character, enemy, rng=None, normalized=False):
+        """
+        (Re)start this battle object for a new fight, as if newly created.
+
+        normalized=True skips filling in missing health/max_health/strength/
+        magic keys; only pass it when both dicts are known to have them
+        (e.g. from create_character and create_enemy).
+
+        Returns:
+            self
+        """
         # Store references (tests check object identity)
         self.character = character
         self.enemy = enemy
+        self.rng = rng or random
 
-        # Ensure required keys exist
-        self.character.setdefault("health", 0)
-        self.character.setdefault("max_health", self.character["health"])
-        self.character.setdefault("strength", self.character.get("strength", 1))
-        self.character.setdefault("magic", self.character.get("magic", 0))
+        if not normalized:
+            # Ensure required keys exist
+            self.character.setdefault("health", 0)
+            self.character.setdefault("max_health", self.character["health"])
+            self.character.setdefault("strength", self.character.get("strength", 1))
+            self.character.setdefault("magic", self.character.get("magic", 0))
 
-        self.enemy.setdefault("health", self.enemy.get("max_health", 0))
-        self.enemy.setdefault("max_health", self.enemy["health"])
-        self.enemy.setdefault("strength", self.enemy.get("strength", 1))
-        self.enemy.setdefault("magic", self.enemy.get("magic", 0))
+            self.enemy.setdefault("health", self.enemy.get("max_health", 0))
+            self.enemy.setdefault("max_health", self.enemy["health"])
+            self.enemy.setdefault("strength", self.enemy.get("strength", 1))
+            self.enemy.setdefault("magic", self.enemy.get("magic", 0))
 
         # Battle state
         self.combat_active = True
         self.turn_counter = 0
+        return self
 
     # ----------------------------------------------------------------------
 
@@ -154,14 +286,35 @@ class SimpleBattle:
         if int(self.character.get("health", 0)) <= 0:
             raise CharacterDeadError("Character is dead and cannot fight.")
 
+        return self._result(self._run_turns())
+
+    def _result(self, result):
+        """start_battle's return value for a 'player' or 'enemy' win."""
+        if result == "player":
+            rewards = get_victory_rewards(self.enemy)
+            return {
+                "winner": "player",
+                "xp_gained": rewards["xp"],
+                "gold_gained": rewards["gold"],
+            }
+        else:
+            return {
+                "winner": "enemy",
+                "xp_gained": 0,
+                "gold_gained": 0,
+            }
+
+    def _run_turns(self):
+        """Play turns until the battle ends; return 'player' or 'enemy'."""
         # Minimal auto-battle loop (no input, safe for tests)
+        result = None
         while self.combat_active:
             self.turn_counter += 1
 
-            # Player turn
+            # Player turn (which may end the battle without a death, e.g. an escape)
             self.player_turn()
             result = self.check_battle_end()
-            if result is not None:
+            if result is not None or not self.combat_active:
                 break
 
             # Enemy turn
@@ -171,23 +324,27 @@ class SimpleBattle:
                 break
 
             # Safety: prevent infinite loops
-            if self.turn_counter > 500:
+            if self.turn_counter > MAX_BATTLE_TURNS:
                 result = "enemy"
                 break
+        return result
 
-        if result == "player":
-            rewards = get_victory_rewards(self.enemy)
-            return {
-                "winner": "player",
-                "xp_gained": rewards["xp"],
-                "gold_gained": rewards["gold"],
-            }
-        else:
-            return {
-                "winner": "enemy",
-                "xp_gained": 0,
-                "gold_gained": 0,
-            }
+    def _resolve_basic_attacks(self):
+        """
+        Same outcome and end state as _run_turns() for a fresh battle of
+        plain basic attacks, computed in O(1) by resolve_basic_fight().
+        """
+        winner, turns, char_hp, enemy_hp = resolve_basic_fight(
+            int(self.character.get("health", 0)), int(self.character.get("strength", 0)),
+            int(self.enemy.get("health", 0)), int(self.enemy.get("strength", 0)),
+        )
+        self.turn_counter = turns
+        self.character["health"] = char_hp
+        self.enemy["health"] = enemy_hp
+        # A battle stopped by the turn cap is still "active", as in the loop
+        if char_hp <= 0 or enemy_hp <= 0:
+            self.combat_active = False
+        return winner
 
     # ----------------------------------------------------------------------
 
@@ -278,20 +435,173 @@ class SimpleBattle:
             True if escaped (combat_active set to False),
             False otherwise.
         """
-        success = random.random() < 0.5
+        success = self.rng.random() < 0.5
         if success:
             self.combat_active = False
         return success
 
 
+# ============================================================================
+# ENCOUNTER POOL
+# ============================================================================
+
+class EncounterPool:
+    """
+    Opt-in recycling of enemies and battles for high-volume encounter loops.
+
+    acquire() hands out a battle against a fresh enemy of the given type,
+    reusing a released battle and its enemy dict when one is free (the
+    enemy is restored from its template in place and the battle is
+    reset()). Call release() when done with both, or use encounter() as a
+    context manager. Released enemies must not be used afterwards.
+
+    The pool uses the registry it was created with (the active one by
+    default) and caches each type's template on first use. At most
+    max_free battles are kept per enemy type.
+    """
+
+    def __init__(self, registry=None, battle_class=SimpleBattle, max_free=64):
+        self.registry = registry or get_enemy_registry()
+        self.battle_class = battle_class
+        self.max_free = max_free
+        self.created = 0
+        self.reused = 0
+        self._templates = {}  # enemy type as passed to acquire -> template
+        self._free = {}       # enemy type -> released battles (with their enemies)
+
+    def acquire(self, character, enemy_type, rng=None, normalized=False):
+        """
+        Return a ready battle between character and a new enemy_type enemy.
+        normalized=True skips the character defaulting (see SimpleBattle.reset).
+
+        Raises:
+            InvalidTargetError if enemy_type not recognized
+        """
+        free = self._free.get(enemy_type)
+        if free:
+            battle = free.pop()
+            enemy = battle.enemy
+            template = self._templates[enemy_type]
+            enemy.clear()
+            enemy.update(template)
+            battle.reset(character, enemy, rng, normalized)
+            self.reused += 1
+        else:
+            if enemy_type not in self._templates:
+                self._templates[enemy_type] = self.registry.lookup(enemy_type)[1]
+            battle = self.battle_class(character, self.registry.create(enemy_type), rng)
+            self.created += 1
+
+        # Issued battles carry (pool, enemy type) until released, so a battle
+        # that is never released leaves nothing behind in the pool
+        battle._pool_issue = (self, enemy_type)
+        return battle
+
+    def release(self, battle):
+        """
+        Return a battle (and its enemy) to the pool.
+
+        Raises:
+            ValueError if battle did not come from this pool or was
+            already released
+        """
+        issue = getattr(battle, "_pool_issue", None)
+        if issue is None or issue[0] is not self:
+            raise ValueError("Battle was not acquired from this pool.")
+        enemy_type = issue[1]
+        battle._pool_issue = None
+        free = self._free.get(enemy_type)
+        if free is None:
+            free = self._free[enemy_type] = []
+        if len(free) < self.max_free:
+            battle.character = None
+            free.append(battle)
+
+    @contextmanager
+    def encounter(self, character, enemy_type, rng=None, normalized=False):
+        """acquire() a battle for the with block and release() it after."""
+        battle = self.acquire(character, enemy_type, rng, normalized)
+        try:
+            yield battle
+        finally:
+            self.release(battle)
+
+
+# ============================================================================
+# ANALYTICAL RESOLUTION
+# ============================================================================
+
+def _ceil_div(a, b):
+    return -(-a // b)
+
+
+def resolve_basic_fight(character_health, character_strength, enemy_health, enemy_strength):
+    """
+    Outcome of SimpleBattle's basic-attack loop from plain stats, in O(1).
+
+    Each side's damage per hit is fixed, so the number of hits either side
+    needs is a ceiling division. The player strikes first each turn and
+    the fight is an enemy win once it passes MAX_BATTLE_TURNS turns.
+
+    Returns:
+        (winner, turns, character_health, enemy_health) at the end
+    """
+    player_dmg = max(1, character_strength - enemy_strength // 4)
+    enemy_dmg = max(1, enemy_strength - character_strength // 4)
+    # Turn on which each side lands its killing blow
+    player_kill = max(1, _ceil_div(enemy_health, player_dmg))
+    enemy_kill = max(1, _ceil_div(character_health, enemy_dmg))
+    last_turn = MAX_BATTLE_TURNS + 1
+
+    if player_kill <= enemy_kill and player_kill <= last_turn:
+        return "player", player_kill, character_health - (player_kill - 1) * enemy_dmg, 0
+    if enemy_kill < player_kill and enemy_kill <= last_turn:
+        return "enemy", enemy_kill, 0, enemy_health - enemy_kill * player_dmg
+    return ("enemy", last_turn,
+            character_health - last_turn * enemy_dmg,
+            enemy_health - last_turn * player_dmg)
+
+
+def resolve_battle_fast(character, enemy, battle_class=None):
+    """
+    Resolve a full battle without modifying character or enemy.
+
+    Opt-in fast path: by default the fight follows SimpleBattle's built-in
+    basic-attack rules and is computed in O(1) by resolve_basic_fight, with
+    the same outcome as start_battle (overridden or patched turn methods
+    are not consulted). Pass battle_class to instead play that class's
+    turns one by one on copies of both dicts.
+
+    Returns:
+        dict: start_battle's result plus 'turns', 'character_health'
+        and 'enemy_health' at the end of the fight
+
+    Raises:
+        CharacterDeadError if character is already dead
+    """
+    if battle_class is not None:
+        battle = battle_class(dict(character), dict(enemy))
+        result = battle.start_battle()
+    else:
+        battle = SimpleBattle(dict(character), dict(enemy))
+        if int(battle.character.get("health", 0)) <= 0:
+            raise CharacterDeadError("Character is dead and cannot fight.")
+        result = battle._result(battle._resolve_basic_attacks())
+    result["turns"] = battle.turn_counter
+    result["character_health"] = battle.character["health"]
+    result["enemy_health"] = battle.enemy["health"]
+    return result
+
+
 # ============================================================================
 # SPECIAL ABILITIES
 # ============================================================================
 
-def use_special_ability(character, enemy):
+def use_special_ability(character, enemy, rng=None):
     """
     Use character's class-specific special ability.
 
+    rng is passed on to chance-based abilities (global random by default).
     This is not used in the autograder tests, but implemented for completeness.
     """
     cls = str(character.get("class", "")).lower()
@@ -301,7 +611,7 @@ def use_special_ability(character, enemy):
     elif cls == "mage":
         return mage_fireball(character, enemy)
     elif cls == "rogue":
-        return rogue_critical_strike(character, enemy)
+        return rogue_critical_strike(character, enemy, rng)
     elif cls == "cleric":
         return cleric_heal(character)
     else:
@@ -322,8 +632,8 @@ def mage_fireball(character, enemy):
     return f"Mage casts Fireball for {dmg} damage!"
 
 
-def rogue_critical_strike(character, enemy):
-    if random.random() < 0.5:
+def rogue_critical_strike(character, enemy, rng=None):
+    if (rng or random).random() < 0.5:
         dmg = int(character.get("strength", 1)) * 3
     else:
         dmg = int(character.get("strength", 1))
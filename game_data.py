@@ -4,6 +4,12 @@ Game Data Module
 """
 
 import os
+import hashlib
+import marshal
+import mmap
+import struct
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 from custom_exceptions import (
     InvalidDataFormatError,
     MissingDataFileError,
@@ -14,58 +20,483 @@ from custom_exceptions import (
 DATA_DIR = "data"
 ITEMS_PATH_DEFAULT = os.path.join(DATA_DIR, "items.txt")
 QUESTS_PATH_DEFAULT = os.path.join(DATA_DIR, "quests.txt")
+ENEMIES_PATH_DEFAULT = os.path.join(DATA_DIR, "enemies.txt")
+
+# Compiled catalogs live next to their text source as <name>.bin
+COMPILED_EXT = ".bin"
+_COMPILED_MAGIC = b"QCAT"
+_COMPILED_VERSION = 2
+_HEADER_LEN = struct.Struct("<I")
+
+# Built-in enemy templates, written to the default enemies file
+DEFAULT_ENEMIES = (
+    {"enemy_id": "goblin", "name": "Goblin", "health": 50, "strength": 8,
+     "magic": 2, "xp_reward": 25, "gold_reward": 10, "min_level": 1},
+    {"enemy_id": "orc", "name": "Orc", "health": 80, "strength": 12,
+     "magic": 5, "xp_reward": 50, "gold_reward": 25, "min_level": 3},
+    {"enemy_id": "dragon", "name": "Dragon", "health": 200, "strength": 25,
+     "magic": 15, "xp_reward": 200, "gold_reward": 100, "min_level": 6},
+)
+
+# Field order used for the row tuples of each compiled catalog kind
+_CATALOG_FIELDS = {
+    "quests": ("quest_id", "title", "description", "reward_xp",
+               "reward_gold", "required_level", "prerequisite"),
+    "items": ("item_id", "name", "type", "effect", "cost", "description"),
+}
+
+# Fields also stored as header columns, readable without decoding any row
+_HEADER_COLUMNS = {
+    "quests": ("prerequisite",),
+    "items": (),
+}
 
 # -----------------------------------------------------------------------------
-# LOAD QUESTS
+# STREAMING BLOCK READER
 # -----------------------------------------------------------------------------
 
-def load_quests(filename=QUESTS_PATH_DEFAULT):
-    """Load quests from file into dict of quest_id -> quest dict."""
+def _iter_blocks(filename, label):
+    """
+    Yield each blank-line separated block of filename as a list of stripped
+    lines. The file is read one line at a time, so only the current block is
+    ever held in memory.
+    """
     if not os.path.isfile(filename):
-        raise MissingDataFileError(f"Quests file missing: {filename}")
+        raise MissingDataFileError(f"{label.capitalize()} file missing: {filename}")
 
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            raw = f.read()
+        f = open(filename, "r", encoding="utf-8")
     except Exception:
-        raise CorruptedDataError("Could not read quests file")
+        raise CorruptedDataError(f"Could not read {label} file")
+
+    with f:
+        block = []
+        seen_block = False
+        while True:
+            try:
+                raw_line = f.readline()
+            except Exception:
+                raise CorruptedDataError(f"Could not read {label} file")
+            if not raw_line:
+                break
+
+            line = raw_line.strip()
+            if line:
+                block.append(line)
+            elif block:
+                seen_block = True
+                yield block
+                block = []
+
+        # An empty file still yields one (empty) block so it fails validation
+        # exactly like it always has.
+        if block or not seen_block:
+            yield block
+
+
+def _index_by_id(records, id_field, label):
+    """
+    Collect records into an id -> record dict, preserving file order.
+
+    Raises:
+        InvalidDataFormatError if an id appears twice
+    """
+    indexed = {}
+    for record in records:
+        record_id = record[id_field]
+        if record_id in indexed:
+            raise InvalidDataFormatError(f"Duplicate {label} id '{record_id}'")
+        indexed[record_id] = record
+    return indexed
 
-    blocks = raw.strip().split("\n\n")
-    quests = {}
+# -----------------------------------------------------------------------------
+# LOAD QUESTS
+# -----------------------------------------------------------------------------
 
-    for block in blocks:
-        lines = [l.strip() for l in block.splitlines() if l.strip()]
+def iter_quests(filename=QUESTS_PATH_DEFAULT):
+    """Yield validated quest dicts one at a time, in file order."""
+    for lines in _iter_blocks(filename, "quests"):
         quest = parse_quest_block(lines)
         validate_quest_data(quest)
-        quests[quest['quest_id']] = quest
+        yield quest
 
-    return quests
+
+def load_quests(filename=QUESTS_PATH_DEFAULT):
+    """
+    Load quests from file into dict of quest_id -> quest dict.
+    Uses the compiled catalog when it is up to date with the text file.
+
+    Raises:
+        InvalidDataFormatError if a quest_id appears twice
+    """
+    compiled = _load_compiled(filename, "quests")
+    if compiled is not None:
+        return compiled
+
+    return _index_by_id(iter_quests(filename), "quest_id", "quest")
 
 # -----------------------------------------------------------------------------
 # LOAD ITEMS
 # -----------------------------------------------------------------------------
 
+def iter_items(filename=ITEMS_PATH_DEFAULT):
+    """Yield validated item dicts one at a time, in file order."""
+    for lines in _iter_blocks(filename, "items"):
+        item = parse_item_block(lines)
+        validate_item_data(item)
+        yield item
+
+
 def load_items(filename=ITEMS_PATH_DEFAULT):
-    """Load items from file into dict of item_id -> item dict."""
-    if not os.path.isfile(filename):
-        raise MissingDataFileError(f"Items file missing: {filename}")
+    """
+    Load items from file into dict of item_id -> item dict.
+    Uses the compiled catalog when it is up to date with the text file.
+
+    Raises:
+        InvalidDataFormatError if a item_id appears twice
+    """
+    compiled = _load_compiled(filename, "items")
+    if compiled is not None:
+        return compiled
+
+    return _index_by_id(iter_items(filename), "item_id", "item")
+
+# -----------------------------------------------------------------------------
+# LOAD ENEMIES
+# -----------------------------------------------------------------------------
+
+def iter_enemies(filename=ENEMIES_PATH_DEFAULT):
+    """Yield validated enemy dicts one at a time, in file order."""
+    for lines in _iter_blocks(filename, "enemies"):
+        enemy = parse_enemy_block(lines)
+        validate_enemy_data(enemy)
+        yield enemy
+
+
+def load_enemies(filename=ENEMIES_PATH_DEFAULT):
+    """
+    Load enemy templates from file into dict of enemy_id -> enemy dict.
+
+    Raises:
+        InvalidDataFormatError if an enemy_id appears twice
+    """
+    return _index_by_id(iter_enemies(filename), "enemy_id", "enemy")
+
+# -----------------------------------------------------------------------------
+# COMPILED CATALOGS
+# -----------------------------------------------------------------------------
+#
+# Layout of a compiled catalog:
+#   b"QCAT" | uint32 header length | marshal(header) | row blobs
+#
+# The header records the source mtime, size and sha256 so a stale catalog is
+# never used, plus the field names (stored once), an index of
+# (record_id, offset, length) entries pointing at each marshalled row tuple
+# and, for the fields in _HEADER_COLUMNS, every record's value in index order.
+
+def compiled_catalog_path(filename):
+    """Return the path of the compiled catalog for a text data file."""
+    return os.path.splitext(filename)[0] + COMPILED_EXT
+
+
+_HASH_CHUNK_SIZE = 1 << 16
+
+
+def _source_digest(filename):
+    """sha256 of filename, hashed in chunks so it is never held in memory at once."""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_fingerprint(filename):
+    st = os.stat(filename)
+    return st.st_mtime_ns, st.st_size, _source_digest(filename)
+
+
+def compile_catalog(filename, kind):
+    """
+    Parse and validate a quests/items text file and write its compiled
+    catalog next to it.
+
+    Returns:
+        Path of the compiled file
+
+    Raises:
+        ValueError for an unknown kind
+        InvalidDataFormatError if an id appears twice
+        (plus the usual load errors)
+    """
+    if kind not in _CATALOG_FIELDS:
+        raise ValueError(f"Unknown catalog kind: {kind}")
+
+    fields = _CATALOG_FIELDS[kind]
+    id_field = fields[0]
+    records = iter_quests(filename) if kind == "quests" else iter_items(filename)
+    records = _index_by_id(records, id_field, kind[:-1]).values()
+
+    rows = []
+    index = []
+    columns = {field: [] for field in _HEADER_COLUMNS[kind]}
+    offset = 0
+    for record in records:
+        blob = marshal.dumps(tuple(record[f] for f in fields))
+        index.append((record[id_field], offset, len(blob)))
+        for field, values in columns.items():
+            values.append(record[field])
+        rows.append(blob)
+        offset += len(blob)
+
+    mtime_ns, size, digest = _source_fingerprint(filename)
+    header = marshal.dumps({
+        "version": _COMPILED_VERSION,
+        "kind": kind,
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "sha256": digest,
+        "fields": fields,
+        "index": index,
+        "columns": columns,
+    })
+
+    path = compiled_catalog_path(filename)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_COMPILED_MAGIC)
+            f.write(_HEADER_LEN.pack(len(header)))
+            f.write(header)
+            for blob in rows:
+                f.write(blob)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        raise CorruptedDataError(f"Could not write compiled catalog: {e}")
+
+    return path
+
+
+def _read_compiled_header(buf, filename, kind):
+    """
+    Return (header, body_start) if buf is a fresh catalog for filename, or
+    None if it is stale, truncated or otherwise unreadable.
+    """
+    magic_len = len(_COMPILED_MAGIC)
+    if buf[:magic_len] != _COMPILED_MAGIC:
+        return None
+    try:
+        (header_len,) = _HEADER_LEN.unpack_from(buf, magic_len)
+        body_start = magic_len + _HEADER_LEN.size + header_len
+        if body_start > len(buf):
+            return None
+        header = marshal.loads(buf[magic_len + _HEADER_LEN.size:body_start])
+    except (EOFError, ValueError, TypeError, struct.error):
+        return None
+
+    if not isinstance(header, dict):
+        return None
+    if header.get("version") != _COMPILED_VERSION or header.get("kind") != kind:
+        return None
+
+    # An unchanged mtime and size means an unchanged source, so a warm start
+    # reads only the compiled file; the source is hashed only when they
+    # differ (e.g. it was touched or copied) to tell whether it really changed.
+    st = os.stat(filename)
+    if header["mtime_ns"] != st.st_mtime_ns or header["size"] != st.st_size:
+        if header["size"] != st.st_size or header["sha256"] != _source_digest(filename):
+            return None
+
+    return header, body_start
+
+
+def _load_compiled(filename, kind):
+    """
+    Return the records of an up-to-date compiled catalog, or None when there
+    is no usable one (missing, stale or unreadable) and the text file must be
+    parsed instead.
+    """
+    path = compiled_catalog_path(filename)
+    if not os.path.isfile(path) or not os.path.isfile(filename):
+        return None
 
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            raw = f.read()
+        with open(path, "rb") as f:
+            buf = f.read()
+        found = _read_compiled_header(buf, filename, kind)
+        if found is None:
+            return None
+        header, body_start = found
+
+        fields = header["fields"]
+        view = memoryview(buf)
+        records = {}
+        for record_id, offset, length in header["index"]:
+            start = body_start + offset
+            records[record_id] = dict(zip(fields, marshal.loads(view[start:start + length])))
+        return records
     except Exception:
-        raise CorruptedDataError("Could not read items file")
+        return None
+
+
+class MappedCatalog(Mapping):
+    """
+    Read-only record_id -> record mapping backed by an mmap of a compiled
+    catalog. Records are decoded the first time they are looked up, so
+    forked workers share the mapped pages until they actually touch a record.
+    """
+
+    def __init__(self, filename, kind):
+        if not os.path.isfile(filename):
+            raise MissingDataFileError(f"{kind.capitalize()} file missing: {filename}")
+
+        path = compiled_catalog_path(filename)
+        try:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise CorruptedDataError(f"Could not map compiled catalog: {e}")
+
+        try:
+            found = _read_compiled_header(self._mm, filename, kind)
+            if found is None:
+                raise CorruptedDataError(f"Compiled catalog is stale or corrupt: {path}")
+            header, body_start = found
+
+            self._fields = header["fields"]
+            self._index = {
+                record_id: (body_start + offset, length)
+                for record_id, offset, length in header["index"]
+            }
+            self._columns = header["columns"]
+            # sha256 of the source text (see quest_handler.catalog_fingerprint)
+            self.fingerprint = header["sha256"][:16]
+        except CorruptedDataError:
+            self._mm.close()
+            raise
+        except (OSError, KeyError, TypeError, ValueError) as e:
+            self._mm.close()
+            raise CorruptedDataError(f"Could not read compiled catalog: {e}")
+        self._decoded = {}
+
+    def __getitem__(self, record_id):
+        record = self._decoded.get(record_id)
+        if record is None:
+            start, length = self._index[record_id]
+            record = dict(zip(self._fields, marshal.loads(self._mm[start:start + length])))
+            self._decoded[record_id] = record
+        return record
+
+    def __contains__(self, record_id):
+        return record_id in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def column(self, field):
+        """
+        Return record_id -> value of field for every record, read from the
+        header without decoding any record. Only the fields listed in
+        _HEADER_COLUMNS for this kind are available (KeyError otherwise).
+        """
+        return dict(zip(self._index, self._columns[field]))
+
+    def close(self):
+        self._decoded.clear()
+        self._mm.close()
+
+
+def open_catalog(filename, kind):
+    """
+    Return a MappedCatalog for a quests/items text file, compiling it first
+    if the compiled catalog is missing or stale.
+    """
+    try:
+        return MappedCatalog(filename, kind)
+    except CorruptedDataError:
+        compile_catalog(filename, kind)
+        return MappedCatalog(filename, kind)
 
-    blocks = raw.strip().split("\n\n")
-    items = {}
 
-    for block in blocks:
-        lines = [l.strip() for l in block.splitlines() if l.strip()]
-        item = parse_item_block(lines)
-        validate_item_data(item)
-        items[item['item_id']] = item
+def compile_data_files():
+    """Compile the default quests and items files."""
+    compile_catalog(QUESTS_PATH_DEFAULT, "quests")
+    compile_catalog(ITEMS_PATH_DEFAULT, "items")
+    return True
 
-    return items
+# -----------------------------------------------------------------------------
+# SHARDED DATA DIRECTORIES
+# -----------------------------------------------------------------------------
+
+def _shard_kind(shard_name):
+    """Classify a shard file by name: quests*.txt or items*.txt."""
+    name = shard_name.lower()
+    if not name.endswith(".txt"):
+        return None
+    if name.startswith("quest"):
+        return "quests"
+    if name.startswith("item"):
+        return "items"
+    return None
+
+
+def _load_shard(shard):
+    """Worker entry point: load one (filename, kind) shard."""
+    filename, kind = shard
+    if kind == "quests":
+        return load_quests(filename)
+    return load_items(filename)
+
+
+def load_catalog_dir(path=DATA_DIR, workers=None):
+    """
+    Load every quests*.txt and items*.txt shard in a directory, parsing the
+    shards in parallel worker processes.
+
+    Returns:
+        {"quests": quest_id -> quest dict, "items": item_id -> item dict}
+
+    Raises:
+        MissingDataFileError if path is not a directory
+        InvalidDataFormatError if the same id appears in two shards
+        (plus any error raised while loading an individual shard)
+    """
+    if not os.path.isdir(path):
+        raise MissingDataFileError(f"Data directory missing: {path}")
+
+    shards = []
+    for shard_name in sorted(os.listdir(path)):
+        kind = _shard_kind(shard_name)
+        if kind is not None:
+            shards.append((os.path.join(path, shard_name), kind))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(shards) <= 1:
+        results = [_load_shard(shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+            results = list(pool.map(_load_shard, shards))
+
+    catalog = {"quests": {}, "items": {}}
+    owners = {"quests": {}, "items": {}}
+    for (filename, kind), records in zip(shards, results):
+        merged = catalog[kind]
+        seen_in = owners[kind]
+        for record_id, record in records.items():
+            if record_id in merged:
+                raise InvalidDataFormatError(
+                    f"Duplicate {kind[:-1]} id '{record_id}' in "
+                    f"{seen_in[record_id]} and {filename}"
+                )
+            merged[record_id] = record
+            seen_in[record_id] = filename
+
+    return catalog
 
 # -----------------------------------------------------------------------------
 # VALIDATION FUNCTIONS (Required By Autograder)
@@ -116,6 +547,28 @@ def validate_item_data(item):
 
     return True
 
+
+def validate_enemy_data(enemy):
+    required = {
+        "enemy_id", "name", "health", "strength", "magic",
+        "xp_reward", "gold_reward", "min_level"
+    }
+
+    if not isinstance(enemy, dict):
+        raise InvalidDataFormatError("Enemy must be dict")
+
+    missing = required - set(enemy.keys())
+    if missing:
+        raise InvalidDataFormatError(f"Missing enemy fields: {missing}")
+
+    for field in ("health", "strength", "magic", "xp_reward", "gold_reward", "min_level"):
+        if not isinstance(enemy[field], int):
+            raise InvalidDataFormatError(f"{field} must be int")
+    if enemy["health"] <= 0:
+        raise InvalidDataFormatError("health must be positive")
+
+    return True
+
 # -----------------------------------------------------------------------------
 # PARSING HELPERS
 # -----------------------------------------------------------------------------
@@ -168,6 +621,35 @@ def parse_item_block(lines):
 
     return out
 
+
+def parse_enemy_block(lines):
+    out = {}
+    for line in lines:
+        if ":" not in line:
+            raise InvalidDataFormatError("Bad enemy line")
+        key, val = map(str.strip, line.split(":", 1))
+        key = key.upper()
+
+        try:
+            if key == "ENEMY_ID": out["enemy_id"] = val.lower()
+            elif key == "NAME": out["name"] = val
+            elif key == "HEALTH": out["health"] = int(val)
+            elif key == "STRENGTH": out["strength"] = int(val)
+            elif key == "MAGIC": out["magic"] = int(val)
+            elif key == "XP_REWARD": out["xp_reward"] = int(val)
+            elif key == "GOLD_REWARD": out["gold_reward"] = int(val)
+            elif key == "MIN_LEVEL": out["min_level"] = int(val)
+        except ValueError:
+            raise InvalidDataFormatError(f"Bad enemy value for {key}: {val}")
+
+    # defaults
+    out.setdefault("magic", 0)
+    out.setdefault("xp_reward", 0)
+    out.setdefault("gold_reward", 0)
+    out.setdefault("min_level", 1)
+
+    return out
+
 # -----------------------------------------------------------------------------
 # DEFAULT FILE CREATION
 # -----------------------------------------------------------------------------
@@ -185,5 +667,17 @@ def create_default_data_files():
         with open(QUESTS_PATH_DEFAULT, "w") as f:
             f.write("QUEST_ID: test_quest\nTITLE: Test\nDESCRIPTION: Test\nREWARD_XP: 10\nREWARD_GOLD: 5\nREQUIRED_LEVEL: 1\nPREREQUISITE: NONE\n")
 
+    # Enemies
+    if not os.path.isfile(ENEMIES_PATH_DEFAULT):
+        with open(ENEMIES_PATH_DEFAULT, "w") as f:
+            f.write("\n".join(
+                "".join(f"{field.upper()}: {value}\n" for field, value in enemy.items())
+                for enemy in DEFAULT_ENEMIES
+            ))
+
     return True
 
+
+if __name__ == "__main__":
+    compile_data_files()
+    print("Compiled data catalogs.")
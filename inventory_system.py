@@ -3,6 +3,9 @@ COMP 163 - Project 3: Quest Chronicles
 Inventory System Module
 """
 
+from collections import Counter
+from contextlib import contextmanager
+
 from custom_exceptions import (
     InventoryFullError,
     ItemNotFoundError,
@@ -13,14 +16,127 @@ from custom_exceptions import (
 MAX_INVENTORY_SIZE = 20
 
 
+# ---------------------------------------------------------------------------
+# INVENTORY CONTAINER
+# ---------------------------------------------------------------------------
+
+class Inventory:
+    """
+    Item ids in the order they were added, plus a per-item count for O(1)
+    membership and count(). It supports the list operations the game uses
+    (in, len, iteration, append, remove, count), compares equal to the
+    list with the same items in the same order, and converts back to the
+    flat list format saves use via to_list(). Removing takes the earliest
+    copies first, like list.remove.
+    """
+
+    __slots__ = ("_items", "_counts")
+
+    def __init__(self, items=()):
+        self._items = []
+        self._counts = Counter()
+        self.extend(items)
+
+    def __contains__(self, item_id):
+        return item_id in self._counts
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __eq__(self, other):
+        if isinstance(other, Inventory):
+            return self._items == other._items
+        if isinstance(other, (list, tuple)):
+            return self._items == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Inventory({self._items!r})"
+
+    def count(self, item_id):
+        return self._counts.get(item_id, 0)
+
+    @staticmethod
+    def _check_quantity(item_id, quantity):
+        if not isinstance(quantity, int) or quantity < 1:
+            raise ValueError(f"Invalid quantity for '{item_id}': {quantity}")
+
+    def add(self, item_id, quantity=1):
+        self._check_quantity(item_id, quantity)
+        self._items.extend([item_id] * quantity)
+        self._counts[item_id] += quantity
+
+    def append(self, item_id):
+        self.add(item_id)
+
+    def extend(self, item_ids):
+        for item_id in item_ids:
+            self.add(item_id)
+
+    def remove(self, item_id, quantity=1):
+        """Remove quantity copies; ValueError (like list.remove) if short."""
+        self._check_quantity(item_id, quantity)
+        have = self._counts.get(item_id, 0)
+        if have < quantity:
+            raise ValueError(f"{item_id!r} not in inventory")
+
+        if quantity == 1:
+            self._items.remove(item_id)
+        else:
+            # One pass dropping the earliest quantity copies
+            kept = []
+            skip = quantity
+            for item in self._items:
+                if skip and item == item_id:
+                    skip -= 1
+                else:
+                    kept.append(item)
+            self._items = kept
+
+        if have == quantity:
+            del self._counts[item_id]
+        else:
+            self._counts[item_id] = have - quantity
+
+    def clear(self):
+        self._items.clear()
+        self._counts.clear()
+
+    def copy(self):
+        other = Inventory()
+        other.restore(self.snapshot())
+        return other
+
+    def snapshot(self):
+        """Opaque copy of the current contents, for restore()."""
+        return list(self._items), self._counts.copy()
+
+    def restore(self, snapshot):
+        """Put back the contents captured by snapshot()."""
+        items, counts = snapshot
+        self._items = list(items)
+        self._counts = counts.copy()
+
+    def to_list(self):
+        return list(self._items)
+
+
 # ---------------------------------------------------------------------------
 # BASIC INVENTORY
 # ---------------------------------------------------------------------------
 
 def _ensure_inventory(character):
-    if "inventory" not in character or character["inventory"] is None:
-        character["inventory"] = []
-    return character["inventory"]
+    """Return character's Inventory, converting a saved list on first use."""
+    inv = character.get("inventory")
+    if not isinstance(inv, Inventory):
+        inv = Inventory(inv or ())
+        character["inventory"] = inv
+    return inv
 
 
 def add_item_to_inventory(character, item_id):
@@ -55,27 +171,96 @@ def parse_item_effect(effect_string):
     return stat, value
 
 
-def apply_stat_effect(character, stat, value):
-    if stat == "health":
-        max_hp = character.get("max_health", 0)
-        old = character.get("health", 0)
-        new = min(max_hp, old + value)
-        character["health"] = new
-        return new - old
-
-    if stat == "max_health":
-        character["max_health"] = character.get("max_health", 0) + value
-        return value
+def _apply_health(character, value):
+    max_hp = character.get("max_health", 0)
+    old = character.get("health", 0)
+    new = min(max_hp, old + value)
+    character["health"] = new
+    return new - old
 
-    if stat == "strength":
-        character["strength"] = character.get("strength", 0) + value
-        return value
 
-    if stat == "magic":
-        character["magic"] = character.get("magic", 0) + value
+def _stat_adder(stat):
+    def apply(character, value):
+        character[stat] = character.get(stat, 0) + value
+        # Permanent changes also move the base the effective stat is built on
+        base = character.get("base_stats")
+        if base is not None and stat in base:
+            base[stat] += value
         return value
+    return apply
+
 
-    raise InvalidItemTypeError(f"Unknown stat '{stat}'.")
+def _unknown_stat(stat):
+    def apply(character, value):
+        raise InvalidItemTypeError(f"Unknown stat '{stat}'.")
+    return apply
+
+
+_STAT_APPLIERS = {
+    "health": _apply_health,
+    "max_health": _stat_adder("max_health"),
+    "strength": _stat_adder("strength"),
+    "magic": _stat_adder("magic"),
+}
+
+
+def apply_stat_effect(character, stat, value):
+    applier = _STAT_APPLIERS.get(stat)
+    if applier is None:
+        raise InvalidItemTypeError(f"Unknown stat '{stat}'.")
+    return applier(character, value)
+
+
+# ---------------------------------------------------------------------------
+# COMPILED EFFECTS
+# ---------------------------------------------------------------------------
+#
+# Effect strings ("strength:5", or "strength:5,magic:3" for several stats)
+# are parsed once into a tuple of (stat, value, applier) entries and cached
+# by string, so using or equipping an item never re-parses its effect.
+
+_EFFECT_CACHE = {}
+
+
+def compile_item_effect(effect_string):
+    """
+    Return the compiled (stat, value, applier) tuple for an effect string.
+
+    Raises:
+        InvalidItemTypeError for a malformed effect
+    """
+    compiled = _EFFECT_CACHE.get(effect_string)
+    if compiled is None:
+        if not isinstance(effect_string, str):
+            raise InvalidItemTypeError("Invalid effect format.")
+        entries = []
+        for part in effect_string.split(","):
+            stat, value = parse_item_effect(part)
+            applier = _STAT_APPLIERS.get(stat) or _unknown_stat(stat)
+            entries.append((stat, value, applier))
+        compiled = tuple(entries)
+        _EFFECT_CACHE[effect_string] = compiled
+    return compiled
+
+
+def _check_effect_stats(compiled):
+    """Raise InvalidItemTypeError before anything is applied if a stat is unknown."""
+    for stat, _, _ in compiled:
+        if stat not in _STAT_APPLIERS:
+            raise InvalidItemTypeError(f"Unknown stat '{stat}'.")
+
+
+def compile_item_effects(item_data_dict):
+    """
+    Precompile the effect of every item in a catalog (call at load time).
+    Items with malformed effects are skipped; they still raise when used.
+    """
+    for item in item_data_dict.values():
+        try:
+            compile_item_effect(item.get("effect", ""))
+        except InvalidItemTypeError:
+            pass
+    return True
 
 
 # ---------------------------------------------------------------------------
@@ -90,8 +275,11 @@ def use_item(character, item_id, item_data):
     if item_data.get("type") != "consumable":
         raise InvalidItemTypeError("Only consumables can be used.")
 
-    stat, val = parse_item_effect(item_data.get("effect", "health:0"))
-    healed = apply_stat_effect(character, stat, val)
+    compiled = compile_item_effect(item_data.get("effect", "health:0"))
+    _check_effect_stats(compiled)
+    healed = 0
+    for _, val, apply in compiled:
+        healed += apply(character, val)
 
     remove_item_from_inventory(character, item_id)
 
@@ -99,54 +287,137 @@ def use_item(character, item_id, item_data):
 
 
 # ---------------------------------------------------------------------------
-# EQUIPPING ITEMS
+# EQUIPMENT AND DERIVED STATS
 # ---------------------------------------------------------------------------
+#
+# Gear never edits max_health/strength/magic directly. The character keeps
+# its base values in character["base_stats"] and each slot's modifiers in
+# equipped_<slot>_bonus; the effective values stored under the usual keys
+# are recomputed from those whenever gear changes (and bumped together with
+# the base on level-up), so readers like combat just read character[stat].
+# Gear bonuses to other stats (e.g. health) are applied once on equip and
+# reversed on unequip, as before.
+
+DERIVED_STATS = ("max_health", "strength", "magic")
+_GEAR_SLOTS = ("weapon", "armor")
+
+
+def _bonus_pairs(bonus):
+    """Stored equipment bonus -> list of (stat, value) pairs."""
+    if bonus and isinstance(bonus[0], str):
+        return [bonus]
+    return bonus or ()
+
+
+def _store_bonus(compiled):
+    """Single-stat bonuses keep the original (stat, value) save format."""
+    if len(compiled) == 1:
+        return (compiled[0][0], compiled[0][1])
+    return [(stat, value) for stat, value, _ in compiled]
+
+
+def _gear_bonuses(character):
+    for slot in _GEAR_SLOTS:
+        if f"equipped_{slot}" in character:
+            yield from _bonus_pairs(character.get(f"equipped_{slot}_bonus"))
+
+
+def _base_stats(character):
+    """
+    Return character["base_stats"], deriving it on first use (older saves
+    only have effective stats) by subtracting the current gear bonuses.
+    """
+    base = character.get("base_stats")
+    if base is None:
+        base = {stat: int(character.get(stat, 0)) for stat in DERIVED_STATS}
+        for stat, val in _gear_bonuses(character):
+            if stat in base:
+                base[stat] -= val
+        character["base_stats"] = base
+    return base
+
+
+def refresh_effective_stats(character):
+    """
+    Recompute and store effective derived stats: base + gear. Current
+    health is clamped to the new max_health (e.g. after removing armor).
+    """
+    effective = dict(_base_stats(character))
+    for stat, val in _gear_bonuses(character):
+        if stat in effective:
+            effective[stat] += val
+    character.update(effective)
+    if character.get("health", 0) > effective["max_health"]:
+        character["health"] = effective["max_health"]
+    return effective
+
+
+def _apply_gear_extras(character, pairs, sign, raw):
+    """Apply (or with sign=-1 reverse) gear bonuses to non-derived stats."""
+    for stat, val in pairs:
+        if stat in DERIVED_STATS:
+            continue
+        if raw:
+            character[stat] += sign * val
+        else:
+            apply_stat_effect(character, stat, sign * val)
+
+
+def _unequip(character, slot, inv):
+    """Take off the item in slot (if any) and return it to the inventory."""
+    if f"equipped_{slot}" not in character:
+        return None
+    _base_stats(character)
+    item_id = character.pop(f"equipped_{slot}")
+    bonus = character.pop(f"equipped_{slot}_bonus", None)
+    _apply_gear_extras(character, _bonus_pairs(bonus), -1, raw=(slot == "weapon"))
+    inv.append(item_id)
+    return item_id
 
-def equip_weapon(character, item_id, item_data):
+
+def _equip(character, slot, item_id, item_data):
     inv = _ensure_inventory(character)
     if item_id not in inv:
         raise ItemNotFoundError(f"Item '{item_id}' not in inventory.")
 
-    if item_data.get("type") != "weapon":
-        raise InvalidItemTypeError("Not a weapon.")
+    if item_data.get("type") != slot:
+        raise InvalidItemTypeError("Not a weapon." if slot == "weapon" else "Not armor.")
 
-    # Unequip old weapon
-    if "equipped_weapon" in character:
-        old_stat, old_val = character["equipped_weapon_bonus"]
-        character[old_stat] -= old_val
-        inv.append(character["equipped_weapon"])
+    compiled = compile_item_effect(item_data["effect"])
 
-    stat, val = parse_item_effect(item_data["effect"])
-    character[stat] += val
+    _base_stats(character)
+    _unequip(character, slot, inv)
 
-    character["equipped_weapon"] = item_id
-    character["equipped_weapon_bonus"] = (stat, val)
+    bonus = _store_bonus(compiled)
+    _apply_gear_extras(character, _bonus_pairs(bonus), 1, raw=(slot == "weapon"))
+    character[f"equipped_{slot}"] = item_id
+    character[f"equipped_{slot}_bonus"] = bonus
 
     inv.remove(item_id)
+    refresh_effective_stats(character)
     return True
 
 
-def equip_armor(character, item_id, item_data):
-    inv = _ensure_inventory(character)
-    if item_id not in inv:
-        raise ItemNotFoundError(f"Item '{item_id}' not in inventory.")
+def equip_weapon(character, item_id, item_data):
+    return _equip(character, "weapon", item_id, item_data)
 
-    if item_data.get("type") != "armor":
-        raise InvalidItemTypeError("Not armor.")
 
-    if "equipped_armor" in character:
-        old_stat, old_val = character["equipped_armor_bonus"]
-        apply_stat_effect(character, old_stat, -old_val)
-        inv.append(character["equipped_armor"])
+def equip_armor(character, item_id, item_data):
+    return _equip(character, "armor", item_id, item_data)
 
-    stat, val = parse_item_effect(item_data["effect"])
-    apply_stat_effect(character, stat, val)
 
-    character["equipped_armor"] = item_id
-    character["equipped_armor_bonus"] = (stat, val)
+def unequip_weapon(character):
+    """Unequip the current weapon. Returns its item id (None if none)."""
+    item_id = _unequip(character, "weapon", _ensure_inventory(character))
+    refresh_effective_stats(character)
+    return item_id
 
-    inv.remove(item_id)
-    return True
+
+def unequip_armor(character):
+    """Unequip the current armor. Returns its item id (None if none)."""
+    item_id = _unequip(character, "armor", _ensure_inventory(character))
+    refresh_effective_stats(character)
+    return item_id
 
 
 # ---------------------------------------------------------------------------
@@ -180,3 +451,130 @@ def sell_item(character, item_id, item_data):
     character["gold"] = character.get("gold", 0) + sell_price
     return sell_price
 
+
+# ---------------------------------------------------------------------------
+# BULK TRANSACTIONS
+# ---------------------------------------------------------------------------
+
+# Character fields a bulk transaction may change (and restores on failure)
+_TRANSACTION_FIELDS = ("gold", "health", "max_health", "strength", "magic")
+
+
+@contextmanager
+def _transaction(character):
+    """Undo every change to gold, stats and inventory if the block raises."""
+    inv = _ensure_inventory(character)
+    saved_inv = inv.snapshot()
+    saved = {key: character[key] for key in _TRANSACTION_FIELDS if key in character}
+    saved_base = dict(character["base_stats"]) if "base_stats" in character else None
+    try:
+        yield inv
+    except Exception:
+        inv.restore(saved_inv)
+        if saved_base is not None:
+            character["base_stats"] = saved_base
+        for key in _TRANSACTION_FIELDS:
+            if key in saved:
+                character[key] = saved[key]
+            else:
+                character.pop(key, None)
+        raise
+
+
+def _merge_quantities(entries, item_data):
+    """Validate (item_id, quantity) pairs and merge repeated item ids."""
+    merged = {}
+    for item_id, quantity in entries:
+        if not isinstance(quantity, int) or quantity < 1:
+            raise ValueError(f"Invalid quantity for '{item_id}': {quantity}")
+        if item_id not in item_data:
+            raise ItemNotFoundError(f"Unknown item '{item_id}'.")
+        merged[item_id] = merged.get(item_id, 0) + quantity
+    return merged
+
+
+def _check_owned(inv, quantities):
+    for item_id, quantity in quantities.items():
+        if inv.count(item_id) < quantity:
+            raise ItemNotFoundError(
+                f"Need {quantity} x '{item_id}', have {inv.count(item_id)}."
+            )
+
+
+def purchase_items(character, purchases, item_data):
+    """
+    Buy several items at once. purchases is a list of (item_id, quantity)
+    and item_data maps item_id -> item dict.
+
+    Gold and inventory space are checked once for the whole order; either
+    everything is bought or nothing changes.
+
+    Returns:
+        Total gold spent
+    """
+    quantities = _merge_quantities(purchases, item_data)
+    total_cost = sum(item_data[i].get("cost", 0) * q for i, q in quantities.items())
+    total_count = sum(quantities.values())
+
+    with _transaction(character) as inv:
+        gold = character.get("gold", 0)
+        if gold < total_cost:
+            raise InsufficientResourcesError("Not enough gold")
+        if len(inv) + total_count > MAX_INVENTORY_SIZE:
+            raise InventoryFullError("Inventory full")
+
+        character["gold"] = gold - total_cost
+        for item_id, quantity in quantities.items():
+            inv.add(item_id, quantity)
+
+    return total_cost
+
+
+def sell_items(character, sales, item_data):
+    """
+    Sell several items at once for half their cost each. sales is a list of
+    (item_id, quantity); nothing is sold unless every item is owned.
+
+    Returns:
+        Total gold received
+    """
+    quantities = _merge_quantities(sales, item_data)
+
+    with _transaction(character) as inv:
+        _check_owned(inv, quantities)
+
+        total = 0
+        for item_id, quantity in quantities.items():
+            inv.remove(item_id, quantity)
+            total += (item_data[item_id].get("cost", 0) // 2) * quantity
+        character["gold"] = character.get("gold", 0) + total
+
+    return total
+
+
+def use_items(character, uses, item_data):
+    """
+    Use several consumables at once. uses is a list of (item_id, quantity).
+    If any item cannot be used, every effect already applied is undone.
+
+    Returns:
+        Total effect applied (e.g. health restored)
+    """
+    quantities = _merge_quantities(uses, item_data)
+
+    with _transaction(character) as inv:
+        _check_owned(inv, quantities)
+
+        total = 0
+        for item_id, quantity in quantities.items():
+            item = item_data[item_id]
+            if item.get("type") != "consumable":
+                raise InvalidItemTypeError("Only consumables can be used.")
+            compiled = compile_item_effect(item.get("effect", "health:0"))
+            _check_effect_stats(compiled)
+            for _ in range(quantity):
+                for _, val, apply in compiled:
+                    total += apply(character, val)
+            inv.remove(item_id, quantity)
+
+    return total
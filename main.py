@@ -23,6 +23,7 @@ from custom_exceptions import *
 current_character = None
 all_items = {}
 all_quests = {}
+all_quest_graph = None
 game_running = False
 
 
@@ -86,15 +87,33 @@ def save_game():
     return False
 
 
-def load_game_data():
+def load_game_data(lazy=False):
     """
     Loads quests and items using game_data module.
     Used in integration tests (test_load_game_data)
+
+    With lazy=True the catalogs are memory-mapped compiled files that can
+    be shared between forked workers: records are only decoded when first
+    used, and item effects are compiled (and cached) the first time each
+    item is used. Either way the quest prerequisite graph is built here,
+    from the compiled prerequisite column on the lazy path, so missing
+    prerequisites and cycles are reported at load time rather than
+    mid-game. Enemy templates are (re)loaded from data/enemies.txt.
     """
-    global all_items, all_quests
+    global all_items, all_quests, all_quest_graph
+
+    combat_system.set_enemy_registry(None)
+    combat_system.get_enemy_registry()
+
+    if lazy:
+        all_quests = game_data.open_catalog("data/quests.txt", "quests")
+        all_items = game_data.open_catalog("data/items.txt", "items")
+    else:
+        all_quests = game_data.load_quests("data/quests.txt")
+        all_items = game_data.load_items("data/items.txt")
+        inventory_system.compile_item_effects(all_items)
 
-    all_quests = game_data.load_quests("data/quests.txt")
-    all_items = game_data.load_items("data/items.txt")
+    all_quest_graph = quest_handler.QuestGraph(all_quests)
     return True
 
 
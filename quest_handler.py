@@ -3,7 +3,12 @@ COMP 163 - Project 3: Quest Chronicles
 Quest Handler Module - Fully Autograder Compatible
 """
 
+import hashlib
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+
 from custom_exceptions import (
+    InvalidDataFormatError,
     QuestNotFoundError,
     QuestRequirementsNotMetError,
     QuestAlreadyCompletedError,
@@ -14,10 +19,124 @@ from custom_exceptions import (
 import character_manager
 
 
+# ---------------------------------------------------------
+# QUEST STATE LISTS
+# ---------------------------------------------------------
+
+class QuestList(list):
+    """
+    A list of quest ids with an id -> count index alongside it, so
+    `quest_id in quest_list` is O(1). It is still a real list: order,
+    indexing, equality with plain lists and JSON saves are unchanged.
+    """
+
+    __slots__ = ("_index",)
+
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self._reindex()
+
+    def __reduce__(self):
+        # Rebuild through __init__ so the index is never restored separately
+        # from (and then doubled by) the list contents
+        return (type(self), (list(self),))
+
+    def _reindex(self):
+        index = {}
+        for quest_id in list.__iter__(self):
+            index[quest_id] = index.get(quest_id, 0) + 1
+        self._index = index
+
+    def _add(self, quest_id):
+        self._index[quest_id] = self._index.get(quest_id, 0) + 1
+
+    def _discard(self, quest_id):
+        count = self._index[quest_id]
+        if count == 1:
+            del self._index[quest_id]
+        else:
+            self._index[quest_id] = count - 1
+
+    def __contains__(self, quest_id):
+        return quest_id in self._index
+
+    def append(self, quest_id):
+        super().append(quest_id)
+        self._add(quest_id)
+
+    def insert(self, position, quest_id):
+        super().insert(position, quest_id)
+        self._add(quest_id)
+
+    def extend(self, quest_ids):
+        quest_ids = list(quest_ids)
+        super().extend(quest_ids)
+        for quest_id in quest_ids:
+            self._add(quest_id)
+
+    def __iadd__(self, quest_ids):
+        self.extend(quest_ids)
+        return self
+
+    def remove(self, quest_id):
+        if quest_id not in self._index:
+            raise ValueError(f"{quest_id!r} not in list")
+        super().remove(quest_id)
+        self._discard(quest_id)
+
+    def pop(self, position=-1):
+        quest_id = super().pop(position)
+        self._discard(quest_id)
+        return quest_id
+
+    def clear(self):
+        super().clear()
+        self._index = {}
+
+    def __setitem__(self, position, value):
+        super().__setitem__(position, value)
+        self._reindex()
+
+    def __delitem__(self, position):
+        super().__delitem__(position)
+        self._reindex()
+
+    def __imul__(self, times):
+        super().__imul__(times)
+        self._reindex()
+        return self
+
+
+def _quest_list(character, key):
+    """Return character[key] as a QuestList, converting a plain list once."""
+    quests = character.get(key)
+    if not isinstance(quests, QuestList):
+        quests = QuestList(quests or ())
+        character[key] = quests
+    return quests
+
+
 # ---------------------------------------------------------
 # INTERNAL LOOKUP HELPER
 # ---------------------------------------------------------
 
+def _prerequisites(quest):
+    """
+    Return the quest's prerequisite ids as a tuple. PREREQUISITE may list
+    several ids separated by commas; NONE (or empty) means no prerequisite.
+    """
+    return _split_prerequisites(quest.get("prerequisite", "NONE"))
+
+
+def _split_prerequisites(prereq):
+    """Split a raw PREREQUISITE value (see _prerequisites)."""
+    if not prereq or prereq.upper() == "NONE":
+        return ()
+    if "," not in prereq:
+        return (prereq,)
+    return tuple(p.strip() for p in prereq.split(",") if p.strip())
+
+
 def _get_quest(quest_id, quest_data_dict):
     """Return quest dict or raise QuestNotFoundError."""
     if quest_id not in quest_data_dict:
@@ -33,29 +152,30 @@ def accept_quest(character, quest_id, quest_data_dict):
     """Attempt to accept a quest, enforcing all requirements."""
 
     quest = _get_quest(quest_id, quest_data_dict)
+    completed = _quest_list(character, "completed_quests")
+    active = _quest_list(character, "active_quests")
 
     # Level check
     if character.get("level", 1) < quest.get("required_level", 1):
         raise InsufficientLevelError("Level too low for this quest.")
 
     # Prerequisite check
-    prereq = quest.get("prerequisite", "NONE")
-    if prereq and prereq.upper() != "NONE":
-        if prereq not in character.get("completed_quests", []):
+    for prereq in _prerequisites(quest):
+        if prereq not in completed:
             raise QuestRequirementsNotMetError(
                 f"Prerequisite quest '{prereq}' not completed."
             )
 
     # Already completed?
-    if quest_id in character.get("completed_quests", []):
+    if quest_id in completed:
         raise QuestAlreadyCompletedError("Quest already completed.")
 
     # Already active?
-    if quest_id in character.get("active_quests", []):
+    if quest_id in active:
         raise QuestRequirementsNotMetError("Quest already active.")
 
     # Accept the quest
-    character.setdefault("active_quests", []).append(quest_id)
+    active.append(quest_id)
     return True
 
 
@@ -63,22 +183,28 @@ def complete_quest(character, quest_id, quest_data_dict):
     """Mark quest completed and apply rewards."""
 
     quest = _get_quest(quest_id, quest_data_dict)
+    active = _quest_list(character, "active_quests")
+    completed = _quest_list(character, "completed_quests")
 
     # Must be active
-    if quest_id not in character.get("active_quests", []):
+    if quest_id not in active:
         raise QuestNotActiveError("Quest is not active.")
 
     # Remove from active
-    character["active_quests"].remove(quest_id)
-
-    # Add to completed
-    if quest_id not in character.get("completed_quests", []):
-        character.setdefault("completed_quests", []).append(quest_id)
+    active.remove(quest_id)
 
     # Rewards
     xp = int(quest.get("reward_xp", 0))
     gold = int(quest.get("reward_gold", 0))
 
+    # Add to completed, keeping the running totals in step
+    if quest_id not in completed:
+        stats = _quest_stats(character, quest_data_dict)
+        completed.append(quest_id)
+        stats["completed"] += 1
+        stats["total_xp"] += xp
+        stats["total_gold"] += gold
+
     character_manager.gain_experience(character, xp)
     character_manager.add_gold(character, gold)
 
@@ -87,9 +213,10 @@ def complete_quest(character, quest_id, quest_data_dict):
 
 def abandon_quest(character, quest_id):
     """Remove the quest from active quests."""
-    if quest_id not in character.get("active_quests", []):
+    active = _quest_list(character, "active_quests")
+    if quest_id not in active:
         raise QuestNotActiveError("Quest is not active.")
-    character["active_quests"].remove(quest_id)
+    active.remove(quest_id)
     return True
 
 
@@ -115,8 +242,16 @@ def get_completed_quests(character, quest_data_dict):
     ]
 
 
-def get_available_quests(character, quest_data_dict):
-    """Return list of quests character can accept."""
+def get_available_quests(character, quest_data_dict, board=None):
+    """
+    Return list of quests character can accept.
+
+    If board (a QuestBoard for this character) is given, the answer comes
+    from its incrementally maintained index instead of a full scan.
+    """
+    if board is not None:
+        return board.available_quests()
+
     available = []
     for qid, quest in quest_data_dict.items():
         if can_accept_quest(character, qid, quest_data_dict):
@@ -129,11 +264,11 @@ def get_available_quests(character, quest_data_dict):
 # ---------------------------------------------------------
 
 def is_quest_completed(character, quest_id):
-    return quest_id in character.get("completed_quests", [])
+    return quest_id in _quest_list(character, "completed_quests")
 
 
 def is_quest_active(character, quest_id):
-    return quest_id in character.get("active_quests", [])
+    return quest_id in _quest_list(character, "active_quests")
 
 
 def can_accept_quest(character, quest_id, quest_data_dict):
@@ -149,68 +284,503 @@ def can_accept_quest(character, quest_id, quest_data_dict):
         return False
 
     # Already completed or active
-    if quest_id in character.get("completed_quests", []):
+    completed = _quest_list(character, "completed_quests")
+    if quest_id in completed:
         return False
-    if quest_id in character.get("active_quests", []):
+    if quest_id in _quest_list(character, "active_quests"):
         return False
 
     # Prerequisite
-    prereq = quest.get("prerequisite", "NONE")
-    if prereq and prereq.upper() != "NONE":
-        if prereq not in character.get("completed_quests", []):
+    for prereq in _prerequisites(quest):
+        if prereq not in completed:
             return False
 
     return True
 
 
-def get_quest_prerequisite_chain(quest_id, quest_data_dict):
-    """Return ordered prerequisite chain from earliest to this quest."""
+# DFS states for _prerequisite_order
+_VISITING = 1
+_DONE = 2
+
+
+def _prerequisite_map(quest_data_dict):
+    """
+    Return quest_id -> tuple of prerequisite ids for a catalog. A mapped
+    compiled catalog supplies the raw prerequisite column from its header,
+    so no quest record is decoded.
+    """
+    column = getattr(quest_data_dict, "column", None)
+    if column is not None:
+        return {qid: _split_prerequisites(prereq)
+                for qid, prereq in column("prerequisite").items()}
+    return {qid: _prerequisites(quest) for qid, quest in quest_data_dict.items()}
+
+
+def _dependents_map(prerequisites):
+    """Invert quest_id -> prerequisites into prerequisite -> dependent ids."""
+    dependents = {}
+    for qid, prereqs in prerequisites.items():
+        for prereq in prereqs:
+            dependents.setdefault(prereq, []).append(qid)
+    return dependents
+
+
+def _prerequisite_order(quest_id, quest_data_dict, chains=None, prerequisites=None):
+    """
+    Return quest_id's prerequisites (all ancestors, in dependency order)
+    followed by quest_id, visiting each ancestor once.
+
+    chains optionally maps quest ids to already computed chains, which are
+    reused instead of walked again. prerequisites optionally maps quest ids
+    to their prerequisite tuples (see _prerequisite_map), so the quests
+    themselves are never looked up.
+
+    Raises:
+        QuestNotFoundError if a quest in the chain does not exist
+        InvalidDataFormatError if the prerequisites form a cycle
+    """
     if quest_id not in quest_data_dict:
         raise QuestNotFoundError(f"Quest '{quest_id}' not found.")
 
-    chain = []
-    current = quest_id
-
-    while True:
-        if current not in quest_data_dict:
-            raise QuestNotFoundError(f"Quest '{current}' not found.")
-        chain.insert(0, current)
-        prereq = quest_data_dict[current].get("prerequisite", "NONE")
-        if not prereq or prereq.upper() == "NONE":
+    if prerequisites is not None:
+        prereqs_of = prerequisites.__getitem__
+    else:
+        def prereqs_of(qid):
+            return _prerequisites(quest_data_dict[qid])
+
+    order = []
+    state = {quest_id: _VISITING}
+    stack = [(quest_id, iter(prereqs_of(quest_id)))]
+
+    while stack:
+        current, prereqs = stack[-1]
+        for prereq in prereqs:
+            seen = state.get(prereq)
+            if seen == _DONE:
+                continue
+            if seen == _VISITING:
+                path = [qid for qid, _ in stack] + [prereq]
+                raise InvalidDataFormatError(
+                    "Quest prerequisite cycle: " + " -> ".join(reversed(path))
+                )
+            if prereq not in quest_data_dict:
+                raise QuestNotFoundError(f"Quest '{prereq}' not found.")
+            if chains is not None and prereq in chains:
+                for qid in chains[prereq]:
+                    if qid not in state:
+                        state[qid] = _DONE
+                        order.append(qid)
+                continue
+            state[prereq] = _VISITING
+            stack.append((prereq, iter(prereqs_of(prereq))))
             break
-        current = prereq
+        else:
+            stack.pop()
+            state[current] = _DONE
+            order.append(current)
+
+    return order
+
 
-    return chain
+def get_quest_prerequisite_chain(quest_id, quest_data_dict):
+    """Return ordered prerequisite chain from earliest to this quest."""
+    if isinstance(quest_data_dict, QuestGraph):
+        return quest_data_dict.chain(quest_id)
+    return _prerequisite_order(quest_id, quest_data_dict)
 
 
 # ---------------------------------------------------------
-# QUEST STATISTICS
+# QUEST DEPENDENCY GRAPH
 # ---------------------------------------------------------
 
-def get_quest_completion_percentage(character, quest_data_dict):
-    total = len(quest_data_dict)
-    if total == 0:
-        return 0.0
-    completed = len(character.get("completed_quests", []))
-    return (completed / total) * 100.0
+class QuestGraph(Mapping):
+    """
+    Prerequisite graph of a quest catalog, built once (e.g. from
+    game_data.load_quests output). Building it validates the whole catalog:
+    every prerequisite must exist and there must be no cycles. Quests may
+    have several prerequisites.
+
+    Attributes:
+        order:         quest ids in topological order (prerequisites first)
+        prerequisites: quest_id -> tuple of prerequisite ids
+        dependents:    quest_id -> list of quests that require it
+
+    Chains and depths are memoized, so repeated queries cost O(chain length).
+    Like QuestIndex it is a Mapping over the quests. Only prerequisite ids
+    are read, so a game_data.MappedCatalog stays undecoded. Built from a
+    QuestIndex, it shares the index's dependents map.
+
+    Raises (on construction):
+        QuestNotFoundError for a missing prerequisite
+        InvalidDataFormatError for a prerequisite cycle
+    """
+
+    def __init__(self, quest_data_dict):
+        if isinstance(quest_data_dict, QuestIndex):
+            self.prerequisites = quest_data_dict.prerequisites
+            self.dependents = quest_data_dict.dependents
+            quest_data_dict = quest_data_dict._quests
+        else:
+            self.prerequisites = _prerequisite_map(quest_data_dict)
+            self.dependents = _dependents_map(self.prerequisites)
+        self._quests = quest_data_dict
+        self._fingerprint = None
+        self._chains = {}
+        self._depths = {}
+
+        for qid, prereqs in self.prerequisites.items():
+            for prereq in prereqs:
+                if prereq not in self.prerequisites:
+                    raise QuestNotFoundError(
+                        f"Quest '{qid}' has invalid prerequisite '{prereq}'."
+                    )
+
+        # Kahn's algorithm; anything left over sits on a cycle
+        waiting = {qid: len(prereqs) for qid, prereqs in self.prerequisites.items()}
+        ready = [qid for qid, count in waiting.items() if count == 0]
+        order = []
+        while ready:
+            qid = ready.pop()
+            order.append(qid)
+            for dependent in self.dependents.get(qid, ()):
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) != len(self.prerequisites):
+            stuck = next(qid for qid, count in waiting.items() if count > 0)
+            # Raises InvalidDataFormatError naming the cycle
+            _prerequisite_order(stuck, quest_data_dict, prerequisites=self.prerequisites)
+
+        self.order = order
+
+    def __getitem__(self, quest_id):
+        return self._quests[quest_id]
+
+    def __contains__(self, quest_id):
+        return quest_id in self._quests
+
+    def __iter__(self):
+        return iter(self._quests)
+
+    def __len__(self):
+        return len(self._quests)
+
+    @property
+    def fingerprint(self):
+        """catalog_fingerprint of the wrapped catalog, computed once."""
+        if self._fingerprint is None:
+            self._fingerprint = catalog_fingerprint(self._quests)
+        return self._fingerprint
+
+    def chain(self, quest_id):
+        """Prerequisite chain from earliest to quest_id (memoized)."""
+        chain = self._chains.get(quest_id)
+        if chain is None:
+            chain = tuple(_prerequisite_order(quest_id, self._quests, self._chains,
+                                              self.prerequisites))
+            self._chains[quest_id] = chain
+        return list(chain)
+
+    def depth(self, quest_id):
+        """Length of the longest prerequisite path leading to quest_id."""
+        if quest_id not in self._depths:
+            # The chain is in dependency order, so each prerequisite's
+            # depth is known before the quests that need it
+            for qid in self.chain(quest_id):
+                if qid not in self._depths:
+                    self._depths[qid] = 1 + max(
+                        (self._depths[p] for p in self.prerequisites[qid]),
+                        default=-1,
+                    )
+        return self._depths[quest_id]
 
 
-def get_total_quest_rewards_earned(character, quest_data_dict):
+# ---------------------------------------------------------
+# QUEST INDEX / AVAILABILITY
+# ---------------------------------------------------------
+
+class QuestIndex(Mapping):
+    """
+    Read-only view of a quest catalog with lookup structures built once:
+    quests bucketed by required_level, every quest id sorted by
+    (required_level, catalog position) for bisect range queries, and the
+    prerequisite/dependents maps (shared with the QuestGraph when built
+    from one). It is a Mapping, so it can be passed anywhere a
+    quest_data_dict is.
+    """
+
+    def __init__(self, quest_data_dict):
+        if isinstance(quest_data_dict, QuestGraph):
+            self.prerequisites = quest_data_dict.prerequisites
+            self.dependents = quest_data_dict.dependents
+            quest_data_dict = quest_data_dict._quests
+        else:
+            self.prerequisites = _prerequisite_map(quest_data_dict)
+            self.dependents = _dependents_map(self.prerequisites)
+        self._quests = quest_data_dict
+        self._fingerprint = None
+        self.position = {}
+        self.by_level = {}
+
+        for pos, (qid, quest) in enumerate(quest_data_dict.items()):
+            self.position[qid] = pos
+            level = int(quest.get("required_level", 1))
+            self.by_level.setdefault(level, []).append(qid)
+
+        self.levels = sorted(self.by_level)
+        # Parallel sorted arrays: sorted_levels[i] is sorted_ids[i]'s level
+        self.sorted_ids = []
+        self.sorted_levels = []
+        for level in self.levels:
+            bucket = self.by_level[level]
+            self.sorted_ids.extend(bucket)
+            self.sorted_levels.extend([level] * len(bucket))
+
+    def __getitem__(self, quest_id):
+        return self._quests[quest_id]
+
+    def __contains__(self, quest_id):
+        return quest_id in self._quests
+
+    def __iter__(self):
+        return iter(self._quests)
+
+    def __len__(self):
+        return len(self._quests)
+
+    @property
+    def fingerprint(self):
+        """catalog_fingerprint of the wrapped catalog, computed once."""
+        if self._fingerprint is None:
+            self._fingerprint = catalog_fingerprint(self._quests)
+        return self._fingerprint
+
+    def quest_ids_up_to_level(self, max_level, min_level=None):
+        """Yield ids of quests with min_level < required_level <= max_level."""
+        start = 0 if min_level is None else bisect_right(self.levels, min_level)
+        stop = bisect_right(self.levels, max_level)
+        for level in self.levels[start:stop]:
+            yield from self.by_level[level]
+
+    def _level_span(self, min_level, max_level):
+        """Slice bounds of quests with min_level <= required_level <= max_level."""
+        return (bisect_left(self.sorted_levels, min_level),
+                bisect_right(self.sorted_levels, max_level))
+
+    def _level_window(self, min_level, max_level, offset, limit):
+        """Slice bounds of the level range after applying offset/limit."""
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must not be negative.")
+        start, stop = self._level_span(min_level, max_level)
+        start += offset
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return start, stop
+
+    def count_in_level_range(self, min_level, max_level):
+        """Number of quests with min_level <= required_level <= max_level."""
+        start, stop = self._level_span(min_level, max_level)
+        return max(0, stop - start)
+
+    def quest_ids_in_level_range(self, min_level, max_level, offset=0, limit=None):
+        """
+        Ids of quests with min_level <= required_level <= max_level, ordered
+        by level then catalog order, skipping offset and returning at most
+        limit of them. O(log n + k) for k returned ids.
+        """
+        start, stop = self._level_window(min_level, max_level, offset, limit)
+        return self.sorted_ids[start:stop]
+
+    def iter_quests_in_level_range(self, min_level, max_level, offset=0, limit=None):
+        """Like quest_ids_in_level_range, but lazily yield the quest dicts."""
+        start, stop = self._level_window(min_level, max_level, offset, limit)
+        for pos in range(start, stop):
+            yield self._quests[self.sorted_ids[pos]]
+
+    def quest_page(self, min_level, max_level, page, page_size):
+        """
+        Return (quests, total) for the 0-based page of the level range,
+        where total is the number of quests in the whole range.
+        """
+        if page < 0 or page_size < 1:
+            raise ValueError("page must be >= 0 and page_size >= 1.")
+        quests = list(self.iter_quests_in_level_range(
+            min_level, max_level, offset=page * page_size, limit=page_size
+        ))
+        return quests, self.count_in_level_range(min_level, max_level)
+
+
+class QuestBoard:
+    """
+    Per-character set of accept-able quests, kept up to date incrementally.
+
+    Each query first catches up with what changed since the last one: new
+    entries at the end of completed_quests unlock their dependents, and a
+    level increase unlocks only the level buckets in between. Anything else
+    (a level drop, a completed list that shrank or was replaced) triggers a
+    full rebuild, as does calling rebuild().
+    """
+
+    def __init__(self, index, character):
+        if not isinstance(index, QuestIndex):
+            index = QuestIndex(index)
+        self.index = index
+        self.character = character
+        self.rebuild()
+
+    def _unlocked(self, qid, level, completed):
+        quest = self.index[qid]
+        if int(quest.get("required_level", 1)) > level or qid in completed:
+            return False
+        return all(prereq in completed for prereq in self.index.prerequisites[qid])
+
+    def rebuild(self):
+        completed = _quest_list(self.character, "completed_quests")
+        level = self.character.get("level", 1)
+        self._available = {
+            qid: None
+            for qid in self.index.quest_ids_up_to_level(level)
+            if self._unlocked(qid, level, completed)
+        }
+        self._level = level
+        self._completed = completed
+        self._seen = len(completed)
+
+    def refresh(self):
+        completed = _quest_list(self.character, "completed_quests")
+        level = self.character.get("level", 1)
+
+        if completed is not self._completed or len(completed) < self._seen or level < self._level:
+            self.rebuild()
+            return
+
+        if level > self._level:
+            for qid in self.index.quest_ids_up_to_level(level, self._level):
+                if self._unlocked(qid, level, completed):
+                    self._available[qid] = None
+            self._level = level
+
+        for qid in completed[self._seen:]:
+            self._available.pop(qid, None)
+            for dependent in self.index.dependents.get(qid, ()):
+                if self._unlocked(dependent, level, completed):
+                    self._available[dependent] = None
+        self._seen = len(completed)
+
+    def available_quest_ids(self):
+        """Return ids the character can accept now, in catalog order."""
+        self.refresh()
+        active = _quest_list(self.character, "active_quests")
+        ids = [qid for qid in self._available if qid not in active]
+        ids.sort(key=self.index.position.__getitem__)
+        return ids
+
+    def available_quests(self):
+        """Same result as get_available_quests(character, index)."""
+        return [self.index[qid] for qid in self.available_quest_ids()]
+
+
+# ---------------------------------------------------------
+# QUEST STATISTICS
+# ---------------------------------------------------------
+
+def rebuild_quest_stats(character, quest_data_dict):
+    """
+    Recompute the character's running quest totals from completed_quests
+    (for saves made before they existed, or after editing the list by hand).
+    Completed quests missing from the catalog count but earn nothing.
+    """
     total_xp = 0
     total_gold = 0
-    for qid in character.get("completed_quests", []):
+    completed = character.get("completed_quests", [])
+    for qid in completed:
         q = quest_data_dict.get(qid)
         if q:
             total_xp += int(q.get("reward_xp", 0))
             total_gold += int(q.get("reward_gold", 0))
-    return {"total_xp": total_xp, "total_gold": total_gold}
+    stats = {
+        "completed": len(completed),
+        "total_xp": total_xp,
+        "total_gold": total_gold,
+        "catalog": catalog_fingerprint(quest_data_dict),
+    }
+    character["quest_stats"] = stats
+    return stats
+
+
+def catalog_fingerprint(quest_data_dict):
+    """
+    Digest of every quest's id and rewards, recorded in quest_stats so
+    totals computed against another catalog (or older rewards) are rebuilt.
+    A catalog with a fingerprint attribute (QuestIndex, QuestGraph,
+    game_data.MappedCatalog) supplies it without a scan; a plain dict is
+    hashed on every call.
+    """
+    fingerprint = getattr(quest_data_dict, "fingerprint", None)
+    if fingerprint is not None:
+        return fingerprint
+    digest = hashlib.sha256()
+    for qid, quest in quest_data_dict.items():
+        rewards = (qid, int(quest.get("reward_xp", 0)), int(quest.get("reward_gold", 0)))
+        digest.update(repr(rewards).encode("utf-8"))
+    return digest.hexdigest()[:16]
 
 
-def get_quests_by_level(quest_data_dict, min_level, max_level):
-    return [
+def _quest_stats(character, quest_data_dict):
+    """
+    Return the character's quest_stats totals, rebuilding them when they
+    are missing, their count no longer matches completed_quests, or they
+    were computed against a different catalog.
+    """
+    stats = character.get("quest_stats")
+    if (stats is None
+            or stats.get("completed") != len(character.get("completed_quests", []))
+            or stats.get("catalog") != catalog_fingerprint(quest_data_dict)):
+        stats = rebuild_quest_stats(character, quest_data_dict)
+    return stats
+
+
+def get_quest_completion_percentage(character, quest_data_dict):
+    total = len(quest_data_dict)
+    if total == 0:
+        return 0.0
+    completed = len(character.get("completed_quests", []))
+    return (completed / total) * 100.0
+
+
+def get_total_quest_rewards_earned(character, quest_data_dict):
+    """
+    Total XP and gold from completed quests, read from quest_stats (rebuilt
+    first if they do not match quest_data_dict; see _quest_stats).
+    """
+    stats = _quest_stats(character, quest_data_dict)
+    return {"total_xp": stats["total_xp"], "total_gold": stats["total_gold"]}
+
+
+def get_quests_by_level(quest_data_dict, min_level, max_level, offset=0, limit=None):
+    """
+    Return quests with min_level <= required_level <= max_level, skipping
+    offset and returning at most limit of them.
+
+    Results are ordered by level, then catalog order, so offset and limit
+    page the same way for any catalog. Passing a QuestIndex answers from its
+    sorted level index in O(log n + k); a plain dict is scanned and sorted.
+    """
+    if isinstance(quest_data_dict, QuestIndex):
+        return list(quest_data_dict.iter_quests_in_level_range(
+            min_level, max_level, offset, limit
+        ))
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset and limit must not be negative.")
+    matches = [
         q for q in quest_data_dict.values()
         if min_level <= int(q.get("required_level", 1)) <= max_level
     ]
+    # Stable sort: quests of the same level stay in catalog order
+    matches.sort(key=lambda q: int(q.get("required_level", 1)))
+    stop = None if limit is None else offset + limit
+    return matches[offset:stop]
 
 
 # ---------------------------------------------------------
@@ -233,7 +803,7 @@ def display_quest_list(quest_list):
 
 def display_character_quest_progress(character, quest_data_dict):
     active = len(character.get("active_quests", []))
-    completed = len(character.get("completed_quests", []))
+    completed = _quest_stats(character, quest_data_dict)["completed"]
     pct = get_quest_completion_percentage(character, quest_data_dict)
     totals = get_total_quest_rewards_earned(character, quest_data_dict)
     print(f"Active: {active}")
@@ -247,13 +817,14 @@ def display_character_quest_progress(character, quest_data_dict):
 # ---------------------------------------------------------
 
 def validate_quest_prerequisites(quest_data_dict):
-    for qid, quest in quest_data_dict.items():
-        prereq = quest.get("prerequisite", "NONE")
-        if prereq and prereq.upper() != "NONE":
-            if prereq not in quest_data_dict:
-                raise QuestNotFoundError(
-                    f"Quest '{qid}' has invalid prerequisite '{prereq}'."
-                )
+    """
+    Check every prerequisite exists and that there are no cycles.
+
+    Raises:
+        QuestNotFoundError for a missing prerequisite
+        InvalidDataFormatError for a prerequisite cycle
+    """
+    QuestGraph(quest_data_dict)
     return True
 
 
@@ -0,0 +1,127 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Compact Record Types
+
+Slot-based records for quests, items and characters. They behave like the
+plain dicts used everywhere else (record["gold"], .get(), "key" in record,
+dict(record), ...) but store their known fields in __slots__ instead of a
+per-object hash table, which cuts memory use when millions are alive.
+"""
+
+from collections.abc import MutableMapping
+
+
+class SlotRecord(MutableMapping):
+    """
+    Base class for dict-compatible slot records.
+
+    Subclasses list their known keys in _fields (which doubles as
+    __slots__). Any other key is kept in a small overflow dict that is only
+    created when first needed.
+    """
+
+    __slots__ = ("_extra",)
+    _fields = ()
+    _field_set = frozenset()
+
+    def __init__(self, data=(), **kwargs):
+        self._extra = None
+        self.update(data, **kwargs)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from an existing dict (or any mapping)."""
+        return cls(data)
+
+    def to_dict(self):
+        """Return a plain dict copy of this record."""
+        return dict(self)
+
+    def copy(self):
+        return type(self)(self)
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._field_set:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self):
+        for key in self._fields:
+            try:
+                getattr(self, key)
+            except AttributeError:
+                continue
+            yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class Quest(SlotRecord):
+    """Quest record (same keys as game_data.parse_quest_block output)."""
+
+    _fields = ("quest_id", "title", "description", "reward_xp",
+               "reward_gold", "required_level", "prerequisite")
+    _field_set = frozenset(_fields)
+    __slots__ = _fields
+
+
+class Item(SlotRecord):
+    """Item record (same keys as game_data.parse_item_block output)."""
+
+    _fields = ("item_id", "name", "type", "effect", "cost", "description")
+    _field_set = frozenset(_fields)
+    __slots__ = _fields
+
+
+class Character(SlotRecord):
+    """Character record (same keys as character_manager.create_character)."""
+
+    _fields = ("name", "class", "level", "experience", "health",
+               "max_health", "strength", "magic", "gold", "inventory",
+               "active_quests", "completed_quests")
+    _field_set = frozenset(_fields)
+    __slots__ = _fields
+
+
+class Enemy(SlotRecord):
+    """Enemy record (same keys as combat_system.create_enemy)."""
+
+    _fields = ("name", "health", "max_health", "strength", "magic",
+               "xp_reward", "gold_reward")
+    _field_set = frozenset(_fields)
+    __slots__ = _fields
+
+
+def compact_catalog(catalog, record_cls):
+    """Convert a record_id -> dict catalog into record_id -> record_cls."""
+    return {record_id: record_cls(data) for record_id, data in catalog.items()}
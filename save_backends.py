@@ -0,0 +1,507 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Backends Module
+
+Storage for serialized characters. character_manager turns characters into
+text and hands that text to a backend; the backend only decides where the
+text lives.
+
+- FlatFileBackend:    one {name}_save.txt file per character (default)
+- SQLiteBackend:      every character in one SQLite database file
+- WriteBehindBackend: buffers and coalesces saves in front of another backend
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from custom_exceptions import (
+    CharacterNotFoundError,
+    SaveFileCorruptedError,
+)
+
+
+# ---------------------------------------------------------------------------
+# BACKEND INTERFACE
+# ---------------------------------------------------------------------------
+
+class SaveBackend(ABC):
+    """
+    Interface every save backend implements (a subclass missing any of the
+    abstract methods cannot be instantiated).
+
+    save/load/delete raise CharacterNotFoundError for unknown names and
+    SaveFileCorruptedError when the underlying storage fails.
+
+    Backends also keep a per-character journal (used by incremental saves):
+    an append-only list of text lines that delete() removes together with
+    the save itself.
+    """
+
+    def __init__(self):
+        # Incremental save state character_manager keeps for this backend:
+        # name -> last persisted field values, and name -> number of journal
+        # entries written since the last full save
+        self.persisted = {}
+        self.journal_counts = {}
+
+    @abstractmethod
+    def save(self, name, data):
+        """Store data (text) as name's save."""
+
+    @abstractmethod
+    def load(self, name):
+        """Return name's saved text."""
+
+    @abstractmethod
+    def delete(self, name):
+        """Remove name's save and journal."""
+
+    @abstractmethod
+    def exists(self, name):
+        """True if name has a save."""
+
+    @abstractmethod
+    def append_journal(self, name, line):
+        """Append one line to name's journal."""
+
+    @abstractmethod
+    def read_journal(self, name):
+        """Return the journal lines for name (empty list if none)."""
+
+    @abstractmethod
+    def clear_journal(self, name):
+        """Remove every line of name's journal."""
+
+    @contextmanager
+    def batch(self):
+        """Group several saves; backends may defer work until the end."""
+        yield self
+
+    def flush(self):
+        """Persist anything the backend is still holding back."""
+        return True
+
+    def close(self):
+        self.flush()
+
+
+# ---------------------------------------------------------------------------
+# FLAT FILES
+# ---------------------------------------------------------------------------
+
+def _fsync_directory(directory):
+    """Persist a rename in directory (a no-op where directories can't be opened)."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class FlatFileBackend(SaveBackend):
+    """
+    One text file per character: <directory>/<name>_save.txt
+
+    Saves are atomic: the data is written and fsynced to a temp file in the
+    same directory, which is then renamed over the old save, so a crash
+    leaves either the old or the new save, never a truncated one. The
+    directory is fsynced after the rename so the new save survives a crash.
+    """
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        # Set while a batch() is open: the directory was already created,
+        # and its fsync is done once when the batch ends
+        self._dir_ready = False
+        self._dir_dirty = False
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}_save.txt")
+
+    def journal_path(self, name):
+        return os.path.join(self.directory, f"{name}_save.journal")
+
+    def save(self, name, data):
+        tmp_path = None
+        try:
+            if not self._dir_ready:
+                os.makedirs(self.directory, exist_ok=True)
+            path = self.path(name)
+            # Unique per writer so concurrent saves never share a temp file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            tmp_path = None
+            if self._dir_ready:
+                self._dir_dirty = True
+            else:
+                _fsync_directory(self.directory)
+        except Exception as e:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise SaveFileCorruptedError(f"Could not save character: {e}")
+        return True
+
+    def load(self, name):
+        path = self.path(name)
+        if not os.path.isfile(path):
+            raise CharacterNotFoundError(f"No save found for '{name}'.")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except Exception as e:
+            raise SaveFileCorruptedError(f"Could not read save file: {e}")
+
+    def delete(self, name):
+        path = self.path(name)
+        if not os.path.isfile(path):
+            raise CharacterNotFoundError(f"No save found for '{name}'.")
+        os.remove(path)
+        self.clear_journal(name)
+        return True
+
+    def exists(self, name):
+        return os.path.isfile(self.path(name))
+
+    def append_journal(self, name, line):
+        try:
+            if not self._dir_ready:
+                os.makedirs(self.directory, exist_ok=True)
+            with open(self.journal_path(name), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            raise SaveFileCorruptedError(f"Could not write save journal: {e}")
+        return True
+
+    def read_journal(self, name):
+        try:
+            with open(self.journal_path(name), "r", encoding="utf-8") as f:
+                return f.read().splitlines()
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            raise SaveFileCorruptedError(f"Could not read save journal: {e}")
+
+    def clear_journal(self, name):
+        try:
+            os.remove(self.journal_path(name))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            raise SaveFileCorruptedError(f"Could not clear save journal: {e}")
+        return True
+
+    @contextmanager
+    def batch(self):
+        if self._dir_ready:
+            yield self
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except Exception as e:
+            raise SaveFileCorruptedError(f"Could not create save directory: {e}")
+        self._dir_ready = True
+        try:
+            yield self
+        finally:
+            self._dir_ready = False
+            if self._dir_dirty:
+                self._dir_dirty = False
+                try:
+                    _fsync_directory(self.directory)
+                except OSError as e:
+                    raise SaveFileCorruptedError(f"Could not sync save directory: {e}")
+
+
+# ---------------------------------------------------------------------------
+# SQLITE
+# ---------------------------------------------------------------------------
+
+class SQLiteBackend(SaveBackend):
+    """
+    All characters in a single SQLite file (WAL journal mode).
+
+    Writes are committed every batch_size saves/deletes, and whenever a
+    batch() block ends or flush()/close() is called. With the default
+    batch_size of 1 every save is committed immediately.
+    """
+
+    def __init__(self, path, batch_size=1):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = 0
+        self._batch_depth = 0
+        self._lock = threading.RLock()
+
+        directory = os.path.dirname(path)
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS characters ("
+                "name TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS journal ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "name TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS journal_name ON journal (name, seq)"
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(f"Could not open save database: {e}")
+
+    def _wrote(self):
+        self._pending += 1
+        if self._batch_depth == 0 and self._pending >= self.batch_size:
+            self._commit()
+
+    def _commit(self):
+        try:
+            self._conn.commit()
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(f"Could not commit saves: {e}")
+        self._pending = 0
+
+    def save(self, name, data):
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO characters (name, data) VALUES (?, ?)",
+                    (name, data),
+                )
+            except sqlite3.Error as e:
+                raise SaveFileCorruptedError(f"Could not save character: {e}")
+            self._wrote()
+        return True
+
+    def load(self, name):
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT data FROM characters WHERE name = ?", (name,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                raise SaveFileCorruptedError(f"Could not read save data: {e}")
+        if row is None:
+            raise CharacterNotFoundError(f"No save found for '{name}'.")
+        return row[0]
+
+    def delete(self, name):
+        with self._lock:
+            try:
+                cur = self._conn.execute(
+                    "DELETE FROM characters WHERE name = ?", (name,)
+                )
+            except sqlite3.Error as e:
+                raise SaveFileCorruptedError(f"Could not delete save: {e}")
+            if cur.rowcount == 0:
+                raise CharacterNotFoundError(f"No save found for '{name}'.")
+            self.clear_journal(name)
+        return True
+
+    def exists(self, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM characters WHERE name = ?", (name,)
+            ).fetchone()
+        return row is not None
+
+    def append_journal(self, name, line):
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO journal (name, data) VALUES (?, ?)", (name, line)
+                )
+            except sqlite3.Error as e:
+                raise SaveFileCorruptedError(f"Could not write save journal: {e}")
+            self._wrote()
+        return True
+
+    def read_journal(self, name):
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT data FROM journal WHERE name = ? ORDER BY seq", (name,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                raise SaveFileCorruptedError(f"Could not read save journal: {e}")
+        return [row[0] for row in rows]
+
+    def clear_journal(self, name):
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM journal WHERE name = ?", (name,))
+            except sqlite3.Error as e:
+                raise SaveFileCorruptedError(f"Could not clear save journal: {e}")
+            self._wrote()
+        return True
+
+    @contextmanager
+    def batch(self):
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._pending:
+                    self._commit()
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._commit()
+        return True
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+
+# ---------------------------------------------------------------------------
+# WRITE-BEHIND BUFFER
+# ---------------------------------------------------------------------------
+
+class WriteBehindBackend(SaveBackend):
+    """
+    Buffers saves in memory in front of another backend.
+
+    Repeated saves of the same character only keep the latest data. The
+    buffer is written through once its oldest entry is older than window
+    seconds (checked on each save), when flush()/close() is called, and at
+    interpreter exit for backends that were never closed. Loads see
+    buffered saves immediately. Anything still buffered when the process
+    is killed outright is lost, so call flush() at checkpoints.
+
+    Clearing the journal of a character with a buffered save is deferred
+    until that save is written, so the stored save plus journal stays
+    complete until then.
+    """
+
+    def __init__(self, backend, window=1.0, clock=time.monotonic):
+        super().__init__()
+        self.backend = backend
+        self.window = window
+        self._clock = clock
+        self._pending = {}
+        self._cleared = set()  # buffered names whose journal clear is deferred
+        self._oldest = None
+        self._lock = threading.RLock()
+        _open_write_behind.add(self)
+
+    def _write(self, name):
+        """Write name's buffered save through, then any deferred journal clear."""
+        with self.backend.batch():
+            self.backend.save(name, self._pending[name])
+            if name in self._cleared:
+                self.backend.clear_journal(name)
+                self._cleared.discard(name)
+        del self._pending[name]
+
+    def save(self, name, data):
+        with self._lock:
+            self._pending[name] = data
+            now = self._clock()
+            if self._oldest is None:
+                self._oldest = now
+            elif now - self._oldest >= self.window:
+                self.flush()
+        return True
+
+    def load(self, name):
+        with self._lock:
+            if name in self._pending:
+                return self._pending[name]
+        return self.backend.load(name)
+
+    def delete(self, name):
+        with self._lock:
+            buffered = self._pending.pop(name, None) is not None
+            self._cleared.discard(name)
+            try:
+                return self.backend.delete(name)
+            except CharacterNotFoundError:
+                if buffered:
+                    return True
+                raise
+
+    def exists(self, name):
+        with self._lock:
+            if name in self._pending:
+                return True
+        return self.backend.exists(name)
+
+    def append_journal(self, name, line):
+        with self._lock:
+            # The journal applies on top of the save, so write that first
+            if name in self._pending:
+                self._write(name)
+            return self.backend.append_journal(name, line)
+
+    def read_journal(self, name):
+        with self._lock:
+            if name in self._cleared:
+                return []
+        return self.backend.read_journal(name)
+
+    def clear_journal(self, name):
+        with self._lock:
+            if name in self._pending:
+                self._cleared.add(name)
+                return True
+        return self.backend.clear_journal(name)
+
+    def flush(self):
+        with self._lock:
+            with self.backend.batch():
+                while self._pending:
+                    self._write(next(iter(self._pending)))
+            self._oldest = None
+            return self.backend.flush()
+
+    def close(self):
+        _open_write_behind.discard(self)
+        self.flush()
+        self.backend.close()
+
+
+# Write-behind backends not closed yet, flushed when the interpreter exits
+_open_write_behind = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_write_behind():
+    """Flush every open WriteBehindBackend; re-raise the first failure."""
+    error = None
+    for backend in list(_open_write_behind):
+        try:
+            backend.flush()
+        except Exception as e:
+            error = error or e
+    if error is not None:
+        raise error
@@ -0,0 +1,269 @@
+"""
+Test Combat
+Tests for battle resolution and the batch combat simulator
+"""
+
+import pytest
+import sys
+import os
+import copy
+import gc
+import random
+import weakref
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import character_manager
+import combat_system
+import combat_simulator
+import game_data
+
+# ============================================================================
+# BATCH SIMULATOR TESTS
+# ============================================================================
+
+def random_fights(count, seed=7):
+    """Build random character/enemy pairs, including drawn-out fights"""
+    rng = random.Random(seed)
+    chars, enemies = [], []
+    for _ in range(count):
+        chars.append({'health': rng.randint(1, 400), 'strength': rng.randint(0, 30)})
+        enemies.append({'health': rng.randint(1, 400), 'strength': rng.randint(0, 30),
+                        'xp_reward': rng.randint(0, 50), 'gold_reward': rng.randint(0, 20)})
+    # Both sides deal 1 damage per hit: runs into the turn cap
+    chars.append({'health': 900, 'strength': 0})
+    enemies.append({'health': 900, 'strength': 0, 'xp_reward': 5, 'gold_reward': 5})
+    return chars, enemies
+
+def test_batch_simulation_matches_simple_battle():
+    """Test that every simulated fight ends exactly like SimpleBattle"""
+    chars, enemies = random_fights(300)
+    before = copy.deepcopy((chars, enemies))
+
+    results = combat_simulator.simulate_battles_from_dicts(chars, enemies)
+
+    assert (chars, enemies) == before
+    assert results.turns[-1] == combat_system.MAX_BATTLE_TURNS + 1
+    for i, (char, enemy) in enumerate(zip(*before)):
+        battle = combat_system.SimpleBattle(char, enemy)
+        assert battle.start_battle() == results.battle_results()[i]
+        assert battle.turn_counter == results.turns[i]
+        assert (char['health'], enemy['health']) == (results.player_health[i], results.enemy_health[i])
+
+def test_batch_simulation_totals_and_validation():
+    """Test bulk reward totals and input checks"""
+    results = combat_simulator.simulate_battles(
+        [100, 100], [50, 1], [20, 500], [1, 40], [10, 99], [3, 99]
+    )
+
+    assert results.winners == ['player', 'enemy']
+    assert (results.total_xp, results.total_gold, results.win_rate) == (10, 3, 0.5)
+
+    with pytest.raises(ValueError):
+        combat_simulator.simulate_battles([100], [10, 10], [50], [5])
+    with pytest.raises(CharacterDeadError):
+        combat_simulator.simulate_battles([100, 0], [10, 10], [50, 50], [5, 5])
+
+# ============================================================================
+# ENEMY REGISTRY TESTS
+# ============================================================================
+
+def test_default_registry_matches_builtin_enemies():
+    """Test that data/enemies.txt and the built-in fallback agree"""
+    from_file = combat_system.EnemyRegistry.from_file()
+    builtin = combat_system.EnemyRegistry(combat_system.DEFAULT_ENEMIES)
+
+    assert sorted(from_file) == sorted(builtin) == ['dragon', 'goblin', 'orc']
+    for enemy_type in builtin:
+        assert from_file.create(enemy_type) == builtin.create(enemy_type)
+    assert [combat_system.get_random_enemy_for_level(lvl)['name'] for lvl in (0, 2, 3, 5, 6, 40)] == \
+        ['Goblin', 'Goblin', 'Orc', 'Orc', 'Dragon', 'Dragon']
+
+def test_registry_instances_are_independent_copies():
+    """Test that enemies are copies and templates cannot be changed"""
+    registry = combat_system.EnemyRegistry(combat_system.DEFAULT_ENEMIES)
+    first = registry.create("Goblin")
+    first['health'] = 0
+
+    assert registry.create("goblin")['health'] == 50
+    with pytest.raises(TypeError):
+        registry.template("goblin")['health'] = 1
+    compact = registry.create("orc", compact=True)
+    assert dict(compact) == registry.create("orc")
+    with pytest.raises(InvalidTargetError):
+        registry.create("unicorn")
+
+def test_custom_registry_level_bands(monkeypatch):
+    """Test new enemy types and shared level bands through the module API"""
+    enemies = [dict(e, min_level=lvl)
+               for e, lvl in zip(combat_system.DEFAULT_ENEMIES, (1, 10, 10))]
+    enemies.append({'enemy_id': 'rat', 'name': 'Rat', 'health': 5, 'strength': 1, 'min_level': 1})
+    monkeypatch.setattr(combat_system, '_enemy_registry', combat_system.EnemyRegistry(enemies))
+
+    assert combat_system.create_enemy("rat")['max_health'] == 5
+    assert combat_system.get_enemy_registry().types_for_level(9) == ['goblin', 'rat']
+    picks = {combat_system.get_random_enemy_for_level(12, random.Random(i))['name'] for i in range(20)}
+    assert picks == {'Orc', 'Dragon'}
+
+def test_default_data_files_provide_every_enemy(tmp_path, monkeypatch):
+    """Test that a fresh data directory gets goblins, orcs and dragons"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(combat_system, '_enemy_registry', None)
+    game_data.create_default_data_files()
+
+    assert game_data.load_enemies() == {e['enemy_id']: e for e in game_data.DEFAULT_ENEMIES}
+    for enemy_type in ('goblin', 'orc', 'dragon'):
+        assert combat_system.create_enemy(enemy_type)['name'] == enemy_type.capitalize()
+    assert combat_system.get_random_enemy_for_level(10)['name'] == 'Dragon'
+
+# ============================================================================
+# ENCOUNTER POOL TESTS
+# ============================================================================
+
+def test_encounter_pool_recycles_battles_and_enemies():
+    """Test that pooled encounters reuse objects but start like fresh ones"""
+    pool = combat_system.EncounterPool(combat_system.EnemyRegistry(combat_system.DEFAULT_ENEMIES))
+    char = character_manager.create_character("Pooled", "Warrior")
+
+    with pool.encounter(char, "goblin") as battle:
+        first_enemy = battle.enemy
+        assert battle.start_battle()['winner'] == 'player'
+        battle.enemy['loot'] = 'ears'
+        del battle.enemy['magic']  # same key count as the template
+
+    char['health'] = char['max_health']
+    with pool.encounter(char, "goblin", normalized=True) as again:
+        assert again is battle and again.enemy is first_enemy
+        assert again.enemy == combat_system.create_enemy("goblin")
+        assert (again.turn_counter, again.combat_active, again.character) == (0, True, char)
+
+    fresh = combat_system.SimpleBattle(dict(char), combat_system.create_enemy("goblin"))
+    with pool.encounter(dict(char), "goblin") as pooled:
+        assert pooled.start_battle() == fresh.start_battle()
+        assert pooled.turn_counter == fresh.turn_counter
+
+    assert (pool.created, pool.reused) == (1, 2)
+    with pytest.raises(ValueError):
+        pool.release(battle)
+    with pytest.raises(InvalidTargetError):
+        pool.acquire(char, "unicorn")
+
+def test_encounter_pool_tracks_battles_not_ids():
+    """Test that unreleased battles leave nothing behind in the pool"""
+    registry = combat_system.EnemyRegistry(combat_system.DEFAULT_ENEMIES)
+    pool = combat_system.EncounterPool(registry)
+    other = combat_system.EncounterPool(registry)
+    char = {'health': 100, 'strength': 15}
+
+    abandoned = weakref.ref(pool.acquire(char, "dragon"))
+    gc.collect()
+    assert abandoned() is None
+
+    battle = other.acquire(char, "orc")
+    with pytest.raises(ValueError):
+        pool.release(battle)
+    with pytest.raises(ValueError):
+        pool.release(combat_system.SimpleBattle(char, registry.create("orc")))
+    other.release(battle)
+    assert registry.lookup("ORC") == ("orc", dict(registry.template("orc")))
+
+# ============================================================================
+# ANALYTICAL RESOLUTION TESTS
+# ============================================================================
+
+class TurnByTurnBattle(combat_system.SimpleBattle):
+    """SimpleBattle subclass that plays the same basic attacks"""
+
+    def player_turn(self):
+        super().player_turn()
+
+def test_fast_resolution_matches_turn_loop():
+    """Test that the O(1) path ends battles exactly like start_battle"""
+    chars, enemies = random_fights(300, seed=11)
+    for char, enemy in zip(chars, enemies):
+        battle = combat_system.SimpleBattle(dict(char), dict(enemy))
+        expected = battle.start_battle()
+        expected.update(turns=battle.turn_counter, character_health=battle.character['health'],
+                        enemy_health=battle.enemy['health'])
+
+        assert combat_system.resolve_battle_fast(char, enemy) == expected
+
+def test_start_battle_always_plays_turns():
+    """Test that instance-level turn overrides are honoured by start_battle"""
+    char = {'health': 100, 'strength': 15}
+    battle = combat_system.SimpleBattle(char, combat_system.create_enemy("goblin"))
+    battle.calculate_damage = lambda attacker, defender: 1000
+    assert battle.start_battle()['winner'] == 'player'
+    assert battle.turn_counter == 1
+
+def test_patched_simple_battle_uses_turn_loop():
+    """Test that patching SimpleBattle's turn methods disables the O(1) path"""
+    char = {'health': 100, 'strength': 15}
+    with mock.patch.object(combat_system.SimpleBattle, "calculate_damage", return_value=1000):
+        battle = combat_system.SimpleBattle(char, combat_system.create_enemy("goblin"))
+        assert battle.start_battle()['winner'] == 'player'
+        assert battle.turn_counter == 1
+
+def test_resolve_battle_fast_leaves_inputs_untouched():
+    """Test resolve_battle_fast results and its turn-loop fallback"""
+    char = {'health': 100, 'strength': 15}
+    goblin = combat_system.create_enemy("goblin")
+
+    result = combat_system.resolve_battle_fast(char, goblin)
+
+    assert result == {'winner': 'player', 'xp_gained': 25, 'gold_gained': 10,
+                      'turns': 4, 'character_health': 100 - 3 * 5, 'enemy_health': 0}
+    assert char['health'] == 100 and goblin['health'] == 50
+    assert combat_system.resolve_battle_fast(char, goblin, TurnByTurnBattle) == result
+
+    with pytest.raises(CharacterDeadError):
+        combat_system.resolve_battle_fast({'health': 0}, goblin)
+
+# ============================================================================
+# MONTE CARLO TESTS
+# ============================================================================
+
+def test_chance_based_actions_use_the_given_rng():
+    """Test that abilities and escapes draw from an injected random.Random"""
+    rogue = {'class': 'Rogue', 'strength': 10}
+    hits = []
+    for _ in range(2):
+        enemy = {'health': 1000}
+        combat_system.use_special_ability(rogue, enemy, rng=random.Random(5))
+        hits.append(enemy['health'])
+    assert hits[0] == hits[1]
+
+    escapes = [combat_system.SimpleBattle({'health': 10}, {'health': 10},
+                                          rng=random.Random(9)).attempt_escape()
+               for _ in range(2)]
+    assert escapes[0] == escapes[1]
+
+def test_monte_carlo_is_reproducible_across_workers():
+    """Test that a fixed seed gives the same stats for any worker count"""
+    matchups = [(character_manager.create_character("Luck", "Rogue"), combat_system.create_enemy("orc")),
+                (character_manager.create_character("Faith", "Cleric"), combat_system.create_enemy("goblin"))]
+    before = copy.deepcopy(matchups)
+    options = dict(seed=3, chunk_size=40, ability_chance=0.5, escape_below=0.3)
+
+    serial = combat_simulator.monte_carlo(matchups, 200, workers=1, **options)
+    parallel = combat_simulator.monte_carlo(matchups, 200, workers=2, **options)
+
+    assert matchups == before
+    for a, b in zip(serial, parallel):
+        assert (a.player_wins, a.enemy_wins, a.escapes) == (b.player_wins, b.enemy_wins, b.escapes)
+        assert a.turn_histogram == b.turn_histogram
+        assert a.battles == a.player_wins + a.enemy_wins + a.escapes == 200
+        assert sum(a.turn_histogram.values()) == 200
+        low, high = a.confidence_interval()
+        assert low <= a.win_rate <= high
+
+    from_generator = combat_simulator.monte_carlo((pair for pair in matchups), 200, workers=1, **options)
+    assert [s.turn_histogram for s in from_generator] == [s.turn_histogram for s in serial]
+
+    other_seed = combat_simulator.monte_carlo(matchups, 200, workers=1, **dict(options, seed=4))
+    assert [s.turn_histogram for s in other_seed] != [s.turn_histogram for s in serial]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,224 @@
+"""
+Test Data Loading
+Tests for streaming and cached catalog loading in game_data
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import game_data
+
+QUEST_TEXT = (
+    "QUEST_ID: first\nTITLE: First\nDESCRIPTION: One\nREWARD_XP: 10\n"
+    "REWARD_GOLD: 5\nREQUIRED_LEVEL: 1\nPREREQUISITE: NONE\n"
+    "\n\n"
+    "QUEST_ID: second\nTITLE: Second\nDESCRIPTION: Two\nREWARD_XP: 20\n"
+    "REWARD_GOLD: 10\nREQUIRED_LEVEL: 2\nPREREQUISITE: first\n"
+)
+
+# ============================================================================
+# STREAMING LOADER TESTS
+# ============================================================================
+
+def test_iter_quests_yields_records_in_order(tmp_path):
+    """Test that iter_quests streams validated quests in file order"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+
+    quests = list(game_data.iter_quests(str(path)))
+
+    assert [q['quest_id'] for q in quests] == ['first', 'second']
+    assert quests[1]['prerequisite'] == 'first'
+    assert quests[1]['reward_xp'] == 20
+
+def test_streaming_loader_matches_repo_data():
+    """Test that load_items returns every record iter_items yields"""
+    items = game_data.load_items("data/items.txt")
+    streamed = list(game_data.iter_items("data/items.txt"))
+
+    assert list(items) == [item['item_id'] for item in streamed]
+
+def test_streaming_loader_error_semantics(tmp_path):
+    """Test that the streaming loader keeps the original exceptions"""
+    with pytest.raises(MissingDataFileError):
+        game_data.load_quests(str(tmp_path / "missing.txt"))
+
+    empty = tmp_path / "empty.txt"
+    empty.write_text("")
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_quests(str(empty))
+
+    broken = tmp_path / "broken.txt"
+    broken.write_bytes(b"ITEM_ID: x\nNAME: \xff\xfe\n")
+    with pytest.raises(CorruptedDataError):
+        game_data.load_items(str(broken))
+
+# ============================================================================
+# COMPILED CATALOG TESTS
+# ============================================================================
+
+def test_compiled_catalog_round_trip(tmp_path):
+    """Test that a compiled catalog loads the same records as the text file"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    expected = game_data.load_quests(str(path))
+
+    compiled = game_data.compile_catalog(str(path), "quests")
+
+    assert compiled == str(tmp_path / "quests.bin")
+    assert game_data._load_compiled(str(path), "quests") == expected
+    assert game_data.load_quests(str(path)) == expected
+
+def test_stale_compiled_catalog_is_ignored(tmp_path):
+    """Test that editing the source invalidates the compiled catalog"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    game_data.compile_catalog(str(path), "quests")
+
+    stat = os.stat(path)
+    path.write_text(QUEST_TEXT.replace("REWARD_XP: 20", "REWARD_XP: 99"))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert game_data._load_compiled(str(path), "quests") is None
+    assert game_data.load_quests(str(path))['second']['reward_xp'] == 99
+
+def test_fresh_compiled_catalog_skips_hashing_the_source(tmp_path, monkeypatch):
+    """Test that only a changed mtime/size makes the loader hash the source"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    game_data.compile_catalog(str(path), "quests")
+    expected = game_data.load_quests(str(path))
+
+    hashed = []
+    real_digest = game_data._source_digest
+    monkeypatch.setattr(game_data, "_source_digest", lambda f: hashed.append(f) or real_digest(f))
+
+    assert game_data._load_compiled(str(path), "quests") == expected
+    assert hashed == []
+
+    # Touched but unchanged: hashed once, and the catalog is still used
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert game_data._load_compiled(str(path), "quests") == expected
+    assert hashed == [str(path)]
+
+def test_mapped_catalog_decodes_lazily(tmp_path):
+    """Test that open_catalog exposes a lazily decoded Mapping"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+
+    catalog = game_data.open_catalog(str(path), "quests")
+    try:
+        assert len(catalog) == 2
+        assert 'second' in catalog
+        assert catalog._decoded == {}
+
+        assert catalog['second']['prerequisite'] == 'first'
+        assert list(catalog._decoded) == ['second']
+        assert dict(catalog) == game_data.load_quests(str(path))
+    finally:
+        catalog.close()
+
+@pytest.mark.parametrize("blob", [b"", b"QCAT\x05", b"QCAT\xff\x00\x00\x00abc", b"QCAT\x02\x00\x00\x00N."])
+def test_corrupt_compiled_catalog_is_recompiled(tmp_path, blob):
+    """Test that a truncated or garbled .bin is rebuilt by open_catalog"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    (tmp_path / "quests.bin").write_bytes(blob)
+
+    assert game_data.load_quests(str(path))['first']['reward_xp'] == 10
+    catalog = game_data.open_catalog(str(path), "quests")
+    try:
+        assert sorted(catalog) == ['first', 'second']
+    finally:
+        catalog.close()
+
+def test_open_catalog_requires_source(tmp_path):
+    """Test that a missing source file raises MissingDataFileError"""
+    with pytest.raises(MissingDataFileError):
+        game_data.open_catalog(str(tmp_path / "quests.txt"), "quests")
+
+# ============================================================================
+# SHARDED DIRECTORY TESTS
+# ============================================================================
+
+def test_load_catalog_dir_merges_shards(tmp_path):
+    """Test that quest and item shards are parsed in parallel and merged"""
+    first, second = QUEST_TEXT.split("\n\n\n")
+    (tmp_path / "quests_01.txt").write_text(first)
+    (tmp_path / "quests_02.txt").write_text(second)
+    (tmp_path / "items_01.txt").write_text(
+        "ITEM_ID: potion\nNAME: Potion\nTYPE: consumable\n"
+        "EFFECT: health:5\nCOST: 3\nDESCRIPTION: Heals\n"
+    )
+    (tmp_path / "notes.md").write_text("ignored")
+
+    catalog = game_data.load_catalog_dir(str(tmp_path), workers=2)
+
+    assert sorted(catalog['quests']) == ['first', 'second']
+    assert list(catalog['items']) == ['potion']
+
+def test_load_catalog_dir_rejects_duplicate_ids(tmp_path):
+    """Test that an id defined in two shards raises InvalidDataFormatError"""
+    (tmp_path / "quests_01.txt").write_text(QUEST_TEXT)
+    (tmp_path / "quests_02.txt").write_text(QUEST_TEXT)
+
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_catalog_dir(str(tmp_path), workers=1)
+
+    with pytest.raises(MissingDataFileError):
+        game_data.load_catalog_dir(str(tmp_path / "nope"))
+
+def test_loaders_reject_duplicate_ids_within_a_file(tmp_path):
+    """Test that every loader and the compiler raise on a repeated id"""
+    quests = tmp_path / "quests.txt"
+    quests.write_text(QUEST_TEXT + "\n\n" + QUEST_TEXT)
+    items = tmp_path / "items.txt"
+    items.write_text(
+        "ITEM_ID: potion\nNAME: Potion\nTYPE: consumable\nCOST: 3\n\n"
+        "ITEM_ID: potion\nNAME: Potion\nTYPE: consumable\nCOST: 4\n"
+    )
+    enemies = tmp_path / "enemies.txt"
+    enemies.write_text(
+        "ENEMY_ID: slime\nNAME: Slime\nHEALTH: 10\n\n"
+        "ENEMY_ID: slime\nNAME: Slime\nHEALTH: 12\n"
+    )
+
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_quests(str(quests))
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_items(str(items))
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_enemies(str(enemies))
+    for path, kind in ((quests, "quests"), (items, "items")):
+        with pytest.raises(InvalidDataFormatError):
+            game_data.compile_catalog(str(path), kind)
+        assert not os.path.exists(game_data.compiled_catalog_path(str(path)))
+
+# ============================================================================
+# ENEMY DATA TESTS
+# ============================================================================
+
+def test_load_enemies_parses_and_validates(tmp_path):
+    """Test enemy file parsing, defaults and validation errors"""
+    path = tmp_path / "enemies.txt"
+    path.write_text("ENEMY_ID: Slime\nNAME: Slime\nHEALTH: 10\nSTRENGTH: 2\n")
+
+    assert game_data.load_enemies(str(path)) == {'slime': {
+        'enemy_id': 'slime', 'name': 'Slime', 'health': 10, 'strength': 2,
+        'magic': 0, 'xp_reward': 0, 'gold_reward': 0, 'min_level': 1}}
+
+    path.write_text("ENEMY_ID: slime\nNAME: Slime\nHEALTH: lots\nSTRENGTH: 2\n")
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_enemies(str(path))
+
+    path.write_text("ENEMY_ID: slime\nNAME: Slime\nHEALTH: 5\n")
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_enemies(str(path))
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
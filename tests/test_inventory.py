@@ -0,0 +1,199 @@
+"""
+Test Inventory
+Tests for the counted inventory container and inventory operations
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import character_manager
+import inventory_system
+from inventory_system import Inventory
+from save_backends import SQLiteBackend
+
+# ============================================================================
+# INVENTORY CONTAINER TESTS
+# ============================================================================
+
+def test_saved_list_becomes_counted_inventory():
+    """Test that a list inventory is converted on first use"""
+    char = {'inventory': ['potion', 'sword', 'potion'], 'gold': 0}
+
+    inventory_system.add_item_to_inventory(char, 'potion')
+    inv = char['inventory']
+
+    assert isinstance(inv, Inventory)
+    assert len(inv) == 4
+    assert inv.count('potion') == 3
+    assert inv == ['potion', 'sword', 'potion', 'potion']
+    assert inv != ['potion', 'potion', 'potion', 'sword']
+
+    inventory_system.remove_item_from_inventory(char, 'sword')
+    assert 'sword' not in inv
+    with pytest.raises(ItemNotFoundError):
+        inventory_system.remove_item_from_inventory(char, 'sword')
+
+@pytest.mark.parametrize("quantity", [0, -2, 1.5])
+def test_inventory_rejects_invalid_quantities(quantity):
+    """Test that add/remove quantities must be positive integers"""
+    inv = Inventory(['potion'])
+
+    with pytest.raises(ValueError):
+        inv.add('sword', quantity)
+    with pytest.raises(ValueError):
+        inv.remove('potion', quantity)
+    assert inv == ['potion'] and 'sword' not in inv and len(inv) == 1
+
+def test_inventory_keeps_insertion_order():
+    """Test that the item sequence survives adds and removes like a list"""
+    items = ['a', 'b', 'a', 'c', 'b', 'a']
+    inv = Inventory(items)
+    assert inv.to_list() == items and list(inv) == items
+
+    inv.remove('a', 2)
+    inv.append('a')
+    items.remove('a')
+    items.remove('a')
+    items.append('a')
+    assert inv == items and inv.count('a') == 2
+
+def test_counted_inventory_enforces_max_size():
+    """Test that MAX_INVENTORY_SIZE still applies to stacked items"""
+    char = {'inventory': Inventory(['potion'] * inventory_system.MAX_INVENTORY_SIZE)}
+
+    with pytest.raises(InventoryFullError):
+        inventory_system.add_item_to_inventory(char, 'potion')
+
+def test_counted_inventory_saves_as_list(tmp_path):
+    """Test that an Inventory is saved in the flat list format"""
+    backend = character_manager.set_save_backend(SQLiteBackend(str(tmp_path / "inv.db")))
+    try:
+        char = character_manager.create_character("Packer", "Rogue")
+        for item_id in ('potion', 'sword', 'potion'):
+            inventory_system.add_item_to_inventory(char, item_id)
+        character_manager.save_character(char)
+
+        loaded = character_manager.load_character("Packer")
+        assert loaded['inventory'] == ['potion', 'sword', 'potion']
+    finally:
+        character_manager.set_save_backend(None)
+        backend.close()
+
+# ============================================================================
+# BULK TRANSACTION TESTS
+# ============================================================================
+
+SHOP = {
+    'potion': {'item_id': 'potion', 'type': 'consumable', 'effect': 'health:20', 'cost': 10},
+    'sword': {'item_id': 'sword', 'type': 'weapon', 'effect': 'strength:5', 'cost': 40},
+}
+
+def test_purchase_and_sell_items_in_bulk():
+    """Test buying and selling stacks in one call"""
+    char = character_manager.create_character("Bulk", "Warrior")
+
+    spent = inventory_system.purchase_items(char, [('potion', 5), ('sword', 1)], SHOP)
+
+    assert spent == 90
+    assert char['gold'] == 10
+    assert char['inventory'].count('potion') == 5
+
+    received = inventory_system.sell_items(char, [('potion', 3), ('sword', 1)], SHOP)
+
+    assert received == 3 * 5 + 20
+    assert char['gold'] == 45
+    assert char['inventory'] == ['potion', 'potion']
+
+def test_bulk_purchase_rolls_back_on_failure():
+    """Test that a failed bulk purchase changes nothing"""
+    char = character_manager.create_character("Broke", "Mage")
+
+    with pytest.raises(InsufficientResourcesError):
+        inventory_system.purchase_items(char, [('sword', 3)], SHOP)
+
+    char['gold'] = 1000
+    with pytest.raises(InventoryFullError):
+        inventory_system.purchase_items(char, [('potion', 9), ('potion', 12)], SHOP)
+
+    assert char['gold'] == 1000
+    assert len(char['inventory']) == 0
+
+def test_bulk_use_rolls_back_applied_effects():
+    """Test that use_items undoes earlier effects when a later item fails"""
+    char = character_manager.create_character("Medic", "Cleric")
+    char['health'] = 10
+    inventory_system.purchase_items(char, [('potion', 2), ('sword', 1)], SHOP)
+
+    with pytest.raises(InvalidItemTypeError):
+        inventory_system.use_items(char, [('potion', 2), ('sword', 1)], SHOP)
+    assert char['health'] == 10
+    assert char['inventory'].count('potion') == 2
+
+    healed = inventory_system.use_items(char, [('potion', 2)], SHOP)
+    assert healed == 40
+    assert char['health'] == 50
+    assert 'potion' not in char['inventory']
+
+def test_use_item_with_unknown_stat_changes_nothing():
+    """Test that a multi-stat effect is validated before any stat is applied"""
+    char = character_manager.create_character("Careful", "Mage")
+    char['health'] = 10
+    before = dict(char)
+    inventory_system.add_item_to_inventory(char, 'odd_tonic')
+    tonic = {'type': 'consumable', 'effect': 'health:20, magic:3, luck:1'}
+
+    with pytest.raises(InvalidItemTypeError):
+        inventory_system.use_item(char, 'odd_tonic', tonic)
+    assert (char['health'], char['magic']) == (before['health'], before['magic'])
+    assert 'odd_tonic' in char['inventory']
+
+def test_inventory_snapshot_and_restore():
+    """Test that restore() puts back exactly what snapshot() captured"""
+    inv = Inventory(['potion', 'sword'])
+    saved = inv.snapshot()
+    inv.add('potion', 3)
+    inv.remove('sword')
+
+    inv.restore(saved)
+    assert inv == ['potion', 'sword'] and len(inv) == 2
+    inv.add('potion')
+    inv.restore(saved)
+    assert inv.count('potion') == 1
+
+# ============================================================================
+# COMPILED EFFECT TESTS
+# ============================================================================
+
+def test_effects_are_compiled_once():
+    """Test that effect strings are parsed once and cached"""
+    first = inventory_system.compile_item_effect("strength:5")
+
+    assert first is inventory_system.compile_item_effect("strength:5")
+    assert [(stat, val) for stat, val, _ in first] == [("strength", 5)]
+
+    with pytest.raises(InvalidItemTypeError):
+        inventory_system.compile_item_effect("strength=5")
+
+def test_multi_stat_equipment():
+    """Test equipping and swapping items with several stat bonuses"""
+    char = character_manager.create_character("Multi", "Mage")
+    base_str, base_magic = char['strength'], char['magic']
+    staff = {'type': 'weapon', 'effect': 'strength:2, magic:6'}
+    sword = {'type': 'weapon', 'effect': 'strength:5'}
+    for item_id in ('staff', 'sword'):
+        inventory_system.add_item_to_inventory(char, item_id)
+
+    inventory_system.equip_weapon(char, 'staff', staff)
+    assert (char['strength'], char['magic']) == (base_str + 2, base_magic + 6)
+
+    inventory_system.equip_weapon(char, 'sword', sword)
+    assert (char['strength'], char['magic']) == (base_str + 5, base_magic)
+    assert char['equipped_weapon_bonus'] == ('strength', 5)
+    assert 'staff' in char['inventory']
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
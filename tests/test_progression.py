@@ -0,0 +1,130 @@
+"""
+Test Progression
+Tests for experience, leveling and derived stats
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import character_manager
+import combat_system
+import inventory_system
+
+# ============================================================================
+# LEVELING TESTS
+# ============================================================================
+
+def level_one_at_a_time(char, xp):
+    """Reference implementation: apply level-ups one by one"""
+    char['experience'] += xp
+    while char['experience'] >= char['level'] * 100:
+        char['experience'] -= char['level'] * 100
+        char['level'] += 1
+        char['max_health'] += 10
+        char['strength'] += 2
+        char['magic'] += 2
+        char['health'] = char['max_health']
+
+@pytest.mark.parametrize("xp", [0, 99, 100, 299, 300, 12345, 10 ** 9])
+def test_large_xp_grants_match_step_by_step_leveling(xp):
+    """Test that closed-form leveling matches one-level-at-a-time leveling"""
+    char = character_manager.create_character("Closed", "Warrior")
+    expected = dict(char)
+    level_one_at_a_time(expected, xp)
+
+    leveled = character_manager.gain_experience(char, xp)
+
+    assert char == expected
+    assert leveled == (expected['level'] > 1)
+
+def test_gain_experience_batch():
+    """Test applying XP to many characters at once"""
+    chars = [character_manager.create_character(f"B{i}", "Cleric") for i in range(3)]
+
+    result = character_manager.gain_experience_batch(chars, [50, 100, 5000])
+
+    assert result == [False, True, True]
+    assert [c['level'] for c in chars] == [1, 2, 10]
+
+def test_gain_experience_batch_is_all_or_nothing():
+    """Test that one dead character rejects the whole batch"""
+    alive = character_manager.create_character("Alive", "Mage")
+    dead = character_manager.create_character("Dead", "Mage")
+    dead['health'] = 0
+
+    with pytest.raises(CharacterDeadError):
+        character_manager.gain_experience_batch([alive, dead], [500, 500])
+    assert alive['experience'] == 0
+
+    with pytest.raises(ValueError):
+        character_manager.gain_experience_batch([alive], [1, 2])
+
+# ============================================================================
+# DERIVED STAT TESTS
+# ============================================================================
+
+SWORD = {'type': 'weapon', 'effect': 'strength:5'}
+PLATE = {'type': 'armor', 'effect': 'max_health:20'}
+
+def equipped_warrior():
+    """Create a Warrior wearing the test sword and plate"""
+    char = character_manager.create_character("Geared", "Warrior")
+    for item_id in ('sword', 'plate'):
+        inventory_system.add_item_to_inventory(char, item_id)
+    inventory_system.equip_weapon(char, 'sword', SWORD)
+    inventory_system.equip_armor(char, 'plate', PLATE)
+    return char
+
+def test_gear_modifiers_stay_separate_from_base_stats():
+    """Test that equipping keeps base stats and gear bonuses apart"""
+    char = equipped_warrior()
+
+    assert char['base_stats'] == {'max_health': 120, 'strength': 15, 'magic': 5}
+    assert char['strength'] == 20
+    assert char['max_health'] == 140
+
+    assert inventory_system.unequip_weapon(char) == 'sword'
+    assert char['strength'] == 15
+    assert 'sword' in char['inventory']
+    assert inventory_system.unequip_weapon(char) is None
+
+def test_unequipping_armor_clamps_health():
+    """Test that health never exceeds max_health after removing armor"""
+    char = equipped_warrior()
+    char['health'] = char['max_health']
+
+    inventory_system.unequip_armor(char)
+
+    assert char['max_health'] == 120
+    assert char['health'] == 120
+
+def test_level_up_updates_base_and_effective_stats():
+    """Test that leveling with gear on keeps both views consistent"""
+    char = equipped_warrior()
+
+    character_manager.gain_experience(char, 300)
+    assert char['base_stats']['strength'] == 19
+    assert char['strength'] == 24
+
+    inventory_system.unequip_armor(char)
+    assert char['max_health'] == char['base_stats']['max_health'] == 140
+
+def test_battle_reads_current_effective_strength():
+    """Test that gear changed mid-battle counts on the next swing"""
+    char = character_manager.create_character("Geared", "Warrior")
+    enemy = combat_system.create_enemy("goblin")
+    battle = combat_system.SimpleBattle(char, enemy)
+    assert battle.calculate_damage(char, enemy) == 15 - 8 // 4
+
+    inventory_system.add_item_to_inventory(char, 'sword')
+    inventory_system.equip_weapon(char, 'sword', SWORD)
+
+    assert battle.calculate_damage(char, enemy) == 20 - 8 // 4
+    assert battle.calculate_damage(enemy, char) == 8 - 20 // 4
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,264 @@
+"""
+Test Quests
+Tests for quest state tracking and quest catalog indexes
+"""
+
+import pytest
+import sys
+import os
+import json
+import copy
+import pickle
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import character_manager
+import quest_handler
+from quest_handler import QuestList
+
+# ============================================================================
+# QUEST STATE TESTS
+# ============================================================================
+
+def test_quest_list_keeps_index_in_sync():
+    """Test that QuestList membership follows every list mutation"""
+    quests = QuestList(['a', 'b', 'a'])
+
+    quests.remove('a')
+    assert 'a' in quests
+    quests.remove('a')
+    assert 'a' not in quests
+
+    quests += ['c', 'd']
+    quests.insert(0, 'e')
+    assert quests.pop() == 'd'
+    del quests[0]
+    quests[0] = 'z'
+
+    assert quests == ['z', 'c']
+    assert 'z' in quests and 'b' not in quests and 'd' not in quests
+    assert json.loads(json.dumps(quests)) == ['z', 'c']
+
+def test_quest_list_survives_pickle_and_deepcopy():
+    """Test that copies rebuild the index instead of doubling it"""
+    char = {'active_quests': QuestList(['a', 'b', 'a'])}
+
+    for clone in (pickle.loads(pickle.dumps(char)), copy.deepcopy(char), copy.copy(char['active_quests'])):
+        quests = clone if isinstance(clone, QuestList) else clone['active_quests']
+        assert isinstance(quests, QuestList) and quests == ['a', 'b', 'a']
+        quests.remove('b')
+        assert 'b' not in quests
+        quests.remove('a')
+        quests.remove('a')
+        assert quests == [] and 'a' not in quests
+
+def test_quest_state_uses_indexed_lists():
+    """Test that quest operations convert and maintain indexed lists"""
+    char = character_manager.create_character("Indexed", "Cleric")
+    quests = {
+        'q1': {'quest_id': 'q1', 'required_level': 1, 'prerequisite': 'NONE',
+               'reward_xp': 0, 'reward_gold': 0},
+    }
+
+    quest_handler.accept_quest(char, 'q1', quests)
+    assert isinstance(char['active_quests'], QuestList)
+    assert quest_handler.is_quest_active(char, 'q1')
+
+    quest_handler.complete_quest(char, 'q1', quests)
+    assert isinstance(char['completed_quests'], QuestList)
+    assert quest_handler.is_quest_completed(char, 'q1')
+    assert not quest_handler.is_quest_active(char, 'q1')
+    assert char['completed_quests'] == ['q1']
+
+def test_quest_stats_are_kept_as_running_totals():
+    """Test that complete_quest maintains persisted reward totals"""
+    char = character_manager.create_character("Stats", "Warrior")
+    quests = {qid: make_quest(qid, xp=30, gold=7) for qid in ('a', 'b')}
+    for qid in quests:
+        quest_handler.accept_quest(char, qid, quests)
+        quest_handler.complete_quest(char, qid, quests)
+
+    assert char['quest_stats'] == {'completed': 2, 'total_xp': 60, 'total_gold': 14,
+                                   'catalog': quest_handler.catalog_fingerprint(quests)}
+    assert quest_handler.get_total_quest_rewards_earned(char, quests) == {'total_xp': 60, 'total_gold': 14}
+
+    loaded = character_manager.deserialize_character(character_manager.serialize_character(char))
+    assert loaded['quest_stats'] == char['quest_stats']
+
+    # Saves from before quest_stats existed are rebuilt on first use
+    del loaded['quest_stats']
+    loaded['completed_quests'].append('retired_quest')
+    assert quest_handler.get_total_quest_rewards_earned(loaded, quests) == {'total_xp': 60, 'total_gold': 14}
+    assert loaded['quest_stats']['completed'] == 3
+
+def test_quest_stats_follow_the_catalog_passed_in():
+    """Test that totals from another catalog or older rewards are rebuilt"""
+    char = character_manager.create_character("Rebalanced", "Mage")
+    quests = {qid: make_quest(qid, xp=30, gold=7) for qid in ('a', 'b')}
+    for qid in quests:
+        quest_handler.accept_quest(char, qid, quests)
+        quest_handler.complete_quest(char, qid, quests)
+
+    rebalanced = {qid: dict(q, reward_xp=50) for qid, q in quests.items()}
+    assert quest_handler.get_total_quest_rewards_earned(char, rebalanced) == {'total_xp': 100, 'total_gold': 14}
+    index = quest_handler.QuestIndex(quests)
+    assert quest_handler.get_total_quest_rewards_earned(char, index) == {'total_xp': 60, 'total_gold': 14}
+    assert index.fingerprint == quest_handler.catalog_fingerprint(quests)
+    assert quest_handler.catalog_fingerprint(rebalanced) != index.fingerprint
+
+# ============================================================================
+# QUEST AVAILABILITY INDEX TESTS
+# ============================================================================
+
+def make_quest(qid, level=1, prereq='NONE', xp=10, gold=5):
+    """Build a minimal valid quest dict"""
+    return {'quest_id': qid, 'title': qid.title(), 'description': '',
+            'reward_xp': xp, 'reward_gold': gold,
+            'required_level': level, 'prerequisite': prereq}
+
+CHAIN = {
+    'intro': make_quest('intro'),
+    'side': make_quest('side', level=3),
+    'hunt': make_quest('hunt', prereq='intro'),
+    'boss': make_quest('boss', level=3, prereq='hunt'),
+}
+
+def test_quest_board_tracks_unlocks_incrementally():
+    """Test that QuestBoard matches get_available_quests as state changes"""
+    char = character_manager.create_character("Board", "Warrior")
+    board = quest_handler.QuestBoard(CHAIN, char)
+
+    def check(expected):
+        assert board.available_quest_ids() == expected
+        assert quest_handler.get_available_quests(char, CHAIN) == [CHAIN[q] for q in expected]
+        assert quest_handler.get_available_quests(char, CHAIN, board=board) == [CHAIN[q] for q in expected]
+
+    check(['intro'])
+    quest_handler.accept_quest(char, 'intro', CHAIN)
+    check([])
+    quest_handler.complete_quest(char, 'intro', CHAIN)
+    check(['hunt'])
+    char['completed_quests'].append('hunt')
+    check([])
+    char['level'] = 3
+    check(['side', 'boss'])
+
+def test_level_index_range_queries_and_pages():
+    """Test bisect range queries, limit/offset and pagination"""
+    quests = {f'q{i}': make_quest(f'q{i}', level=(i * 7) % 10 + 1) for i in range(50)}
+    index = quest_handler.QuestIndex(quests)
+
+    scanned = quest_handler.get_quests_by_level(quests, 3, 6)
+    indexed = quest_handler.get_quests_by_level(index, 3, 6)
+    assert indexed == scanned
+    assert [q['required_level'] for q in indexed] == sorted(q['required_level'] for q in indexed)
+    assert index.count_in_level_range(3, 6) == len(scanned) == 20
+    assert index.count_in_level_range(8, 2) == 0
+
+    for offset, limit in ((5, 4), (0, 3), (18, 10)):
+        assert quest_handler.get_quests_by_level(index, 3, 6, offset, limit) == \
+            quest_handler.get_quests_by_level(quests, 3, 6, offset, limit) == indexed[offset:offset + limit]
+
+    page, total = index.quest_page(3, 6, page=2, page_size=8)
+    assert (page, total) == (indexed[16:], 20)
+    assert index.quest_page(3, 6, page=3, page_size=8) == ([], 20)
+
+# ============================================================================
+# QUEST GRAPH TESTS
+# ============================================================================
+
+def test_quest_graph_chains_and_depths():
+    """Test memoized chains, depths and topological order"""
+    quests = dict(CHAIN)
+    quests['side_boss'] = make_quest('side_boss', prereq='side')
+    quests['finale'] = make_quest('finale', prereq='boss, side_boss')
+    graph = quest_handler.QuestGraph(quests)
+
+    assert graph.chain('boss') == ['intro', 'hunt', 'boss']
+    assert graph.chain('finale') == ['intro', 'hunt', 'boss', 'side', 'side_boss', 'finale']
+    assert quest_handler.get_quest_prerequisite_chain('finale', graph) == graph.chain('finale')
+    assert quest_handler.get_quest_prerequisite_chain('boss', quests) == ['intro', 'hunt', 'boss']
+    assert graph.depth('finale') == 3 and graph.depth('side') == 0
+    assert sorted(graph.dependents['side']) == ['side_boss']
+
+    index = quest_handler.QuestIndex(graph)
+    assert index.dependents is graph.dependents and dict(index) == quests
+    assert quest_handler.QuestGraph(index).dependents is index.dependents
+
+    position = {qid: i for i, qid in enumerate(graph.order)}
+    assert all(position[p] < position[q]
+               for q, prereqs in graph.prerequisites.items() for p in prereqs)
+
+def test_quest_graph_rejects_cycles_and_missing_prerequisites():
+    """Test that bad prerequisite data raises instead of looping"""
+    cyclic = {'a': make_quest('a', prereq='c'), 'b': make_quest('b', prereq='a'),
+              'c': make_quest('c', prereq='b'), 'd': make_quest('d')}
+
+    with pytest.raises(InvalidDataFormatError):
+        quest_handler.QuestGraph(cyclic)
+    with pytest.raises(InvalidDataFormatError):
+        quest_handler.get_quest_prerequisite_chain('b', cyclic)
+    with pytest.raises(QuestNotFoundError):
+        quest_handler.validate_quest_prerequisites({'x': make_quest('x', prereq='gone')})
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_load_game_data_rejects_prerequisite_cycles(tmp_path, monkeypatch, lazy):
+    """Test that both load paths fail at load time on a prerequisite cycle"""
+    import main
+    data = tmp_path / "data"
+    data.mkdir()
+    quest = "QUEST_ID: {0}\nTITLE: {0}\nDESCRIPTION: x\nREWARD_XP: 1\nREWARD_GOLD: 1\nREQUIRED_LEVEL: 1\nPREREQUISITE: {1}\n"
+    (data / "quests.txt").write_text(quest.format('a', 'b') + "\n" + quest.format('b', 'a'))
+    (data / "items.txt").write_text("ITEM_ID: p\nNAME: P\nTYPE: consumable\nEFFECT: health:5\nCOST: 1\nDESCRIPTION: x\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "all_quests", {})
+    monkeypatch.setattr(main, "all_items", {})
+    monkeypatch.setattr(main.combat_system, "_enemy_registry", None)
+
+    try:
+        with pytest.raises(InvalidDataFormatError):
+            main.load_game_data(lazy=lazy)
+    finally:
+        for catalog in (main.all_quests, main.all_items):
+            if hasattr(catalog, "close"):
+                catalog.close()
+
+def test_lazy_load_game_data_decodes_nothing(tmp_path, monkeypatch):
+    """Test that the lazy path validates prerequisites without decoding records"""
+    import main
+    data = tmp_path / "data"
+    data.mkdir()
+    quest = "QUEST_ID: {0}\nTITLE: {0}\nDESCRIPTION: x\nREWARD_XP: 1\nREWARD_GOLD: 1\nREQUIRED_LEVEL: 1\nPREREQUISITE: {1}\n"
+    (data / "quests.txt").write_text(quest.format('a', 'NONE') + "\n" + quest.format('b', 'a'))
+    (data / "items.txt").write_text("ITEM_ID: p\nNAME: P\nTYPE: consumable\nEFFECT: health:5\nCOST: 1\nDESCRIPTION: x\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "all_quests", {})
+    monkeypatch.setattr(main, "all_items", {})
+    monkeypatch.setattr(main, "all_quest_graph", None)
+    monkeypatch.setattr(main.combat_system, "_enemy_registry", None)
+
+    main.load_game_data(lazy=True)
+    try:
+        assert main.all_quests._decoded == {} and main.all_items._decoded == {}
+        assert main.all_quest_graph.chain('b') == ['a', 'b']
+        assert main.all_quests._decoded == {}
+    finally:
+        main.all_quests.close()
+        main.all_items.close()
+
+def test_accept_quest_requires_every_prerequisite():
+    """Test that multi-prerequisite quests need all prerequisites completed"""
+    quests = dict(CHAIN, finale=make_quest('finale', prereq='intro, side'))
+    char = character_manager.create_character("Multi", "Rogue")
+    char['completed_quests'] = ['intro']
+
+    assert not quest_handler.can_accept_quest(char, 'finale', quests)
+    with pytest.raises(QuestRequirementsNotMetError):
+        quest_handler.accept_quest(char, 'finale', quests)
+
+    char['completed_quests'].append('side')
+    assert quest_handler.accept_quest(char, 'finale', quests)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
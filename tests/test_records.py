@@ -0,0 +1,66 @@
+"""
+Test Compact Records
+Tests that slot-based records behave like the dicts they replace
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import combat_system
+import game_data
+import inventory_system
+from records import Character, Item, compact_catalog
+
+# ============================================================================
+# RECORD BEHAVIOUR TESTS
+# ============================================================================
+
+def test_character_record_dict_access():
+    """Test that a compact character supports dict-style access"""
+    char = character_manager.create_character("Slim", "Rogue", compact=True)
+
+    assert isinstance(char, Character)
+    assert char['class'] == "Rogue"
+    assert char.get('missing', 7) == 7
+    assert 'gold' in char
+    assert char == character_manager.create_character("Slim", "Rogue")
+
+    # Keys outside the known fields still work
+    char['equipped_weapon'] = "iron_sword"
+    assert char['equipped_weapon'] == "iron_sword"
+    del char['equipped_weapon']
+    assert 'equipped_weapon' not in char
+
+    with pytest.raises(KeyError):
+        char['nope']
+
+def test_records_work_with_existing_modules():
+    """Test that compact records flow through inventory and combat code"""
+    items = compact_catalog(game_data.load_items("data/items.txt"), Item)
+    char = character_manager.create_character("Compact", "Warrior", compact=True)
+
+    inventory_system.purchase_item(char, "health_potion", items["health_potion"])
+    assert "health_potion" in char['inventory']
+
+    character_manager.gain_experience(char, 100)
+    assert char['level'] == 2
+
+    battle = combat_system.SimpleBattle(char, combat_system.create_enemy("goblin"))
+    assert battle.start_battle()['winner'] == "player"
+
+def test_compact_character_save_round_trip():
+    """Test that a compact character saves and loads as a plain dict"""
+    char = character_manager.create_character("CompactSave", "Mage", compact=True)
+    character_manager.save_character(char)
+    try:
+        loaded = character_manager.load_character("CompactSave")
+        assert loaded == char.to_dict()
+    finally:
+        character_manager.delete_character("CompactSave")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,331 @@
+"""
+Test Save System
+Tests for character save backends and save formats
+"""
+
+import pytest
+import sys
+import os
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import character_manager
+import save_backends
+from save_backends import FlatFileBackend, SQLiteBackend, WriteBehindBackend
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    """Install a SQLite backend for the duration of a test"""
+    backend = SQLiteBackend(str(tmp_path / "saves.db"))
+    character_manager.set_save_backend(backend)
+    yield backend
+    character_manager.set_save_backend(None)
+    backend.close()
+
+
+@pytest.fixture
+def flat_backend(tmp_path):
+    """Install a flat-file backend in a temporary directory"""
+    backend = FlatFileBackend(str(tmp_path / "save_games"))
+    character_manager.set_save_backend(backend)
+    yield backend
+    character_manager.set_save_backend(None)
+
+# ============================================================================
+# BACKEND TESTS
+# ============================================================================
+
+def test_default_backend_is_flat_files():
+    """Test that the default backend writes into SAVE_DIR"""
+    backend = character_manager.get_save_backend()
+
+    assert isinstance(backend, FlatFileBackend)
+    assert backend.directory == character_manager.SAVE_DIR
+
+def test_sqlite_backend_round_trip(sqlite_backend):
+    """Test saving, loading and deleting through SQLite"""
+    char = character_manager.create_character("SqlHero", "Cleric")
+    character_manager.save_character(char)
+
+    assert sqlite_backend.exists("SqlHero")
+    assert character_manager.load_character("SqlHero") == char
+
+    character_manager.delete_character("SqlHero")
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("SqlHero")
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.delete_character("SqlHero")
+
+def test_sqlite_backend_batches_commits(tmp_path):
+    """Test that saves inside batch() are committed together"""
+    path = str(tmp_path / "batch.db")
+    backend = SQLiteBackend(path, batch_size=100)
+
+    with backend.batch():
+        for i in range(5):
+            backend.save(f"hero{i}", "{}")
+        assert not SQLiteBackend(path).exists("hero0")
+
+    assert SQLiteBackend(path).exists("hero4")
+    backend.close()
+
+def test_incomplete_backend_cannot_be_created():
+    """Test that SaveBackend subclasses must implement every method"""
+    class LoadOnly(save_backends.SaveBackend):
+        def load(self, name):
+            return ""
+
+    with pytest.raises(TypeError):
+        LoadOnly()
+
+# ============================================================================
+# SAVE FORMAT TESTS
+# ============================================================================
+
+def test_saves_use_versioned_format(sqlite_backend):
+    """Test that new saves carry a version header and JSON body"""
+    char = character_manager.create_character("Versioned", "Mage")
+    character_manager.save_character(char)
+
+    raw = sqlite_backend.load("Versioned")
+
+    assert raw.startswith(f"QCSAVE {character_manager.SAVE_FORMAT_VERSION}\n")
+    assert character_manager.load_character("Versioned") == char
+
+def test_legacy_repr_saves_still_load(sqlite_backend):
+    """Test that old repr-format saves are read transparently"""
+    char = character_manager.create_character("Legacy", "Rogue")
+    sqlite_backend.save("Legacy", repr(char))
+
+    assert character_manager.load_character("Legacy") == char
+
+def test_invalid_save_data_rejected(sqlite_backend):
+    """Test that incomplete or unknown-version saves raise InvalidSaveDataError"""
+    sqlite_backend.save("Partial", "QCSAVE 2\n{\"name\": \"Partial\"}")
+    sqlite_backend.save("Future", "QCSAVE 99\n{}")
+
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.load_character("Partial")
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.load_character("Future")
+
+# ============================================================================
+# BATCH SAVE / LOAD TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_save_and_load_many_characters(flat_backend, workers):
+    """Test batch saves/loads report per-character results"""
+    chars = [character_manager.create_character(f"Batch{i}", "Warrior") for i in range(10)]
+    bad = {"class": "Warrior"}  # no name
+
+    results = character_manager.save_characters(chars + [bad], workers=workers)
+
+    assert results[:10] == [True] * 10
+    assert isinstance(results[10], InvalidSaveDataError)
+
+    loaded = character_manager.load_characters(["Batch3", "Missing", "Batch9"], workers=workers)
+
+    assert loaded[0] == chars[3]
+    assert isinstance(loaded[1], CharacterNotFoundError)
+    assert loaded[2] == chars[9]
+
+def test_batch_save_uses_one_sqlite_transaction(sqlite_backend):
+    """Test that batch saves to SQLite all land"""
+    chars = [character_manager.create_character(f"Sql{i}", "Mage") for i in range(25)]
+
+    assert character_manager.save_characters(chars, workers=3) == [True] * 25
+    assert all(sqlite_backend.exists(f"Sql{i}") for i in range(25))
+
+# ============================================================================
+# DURABILITY TESTS
+# ============================================================================
+
+def test_flat_file_saves_are_atomic(flat_backend, monkeypatch):
+    """Test that a failed write leaves the previous save untouched"""
+    char = character_manager.create_character("Atomic", "Cleric")
+    character_manager.save_character(char)
+
+    def crash(*args):
+        raise OSError("disk on fire")
+
+    monkeypatch.setattr(os, "fsync", crash)
+    char['gold'] = 999
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.save_character(char)
+
+    assert character_manager.load_character("Atomic")['gold'] == 100
+    assert os.listdir(flat_backend.directory) == ["Atomic_save.txt"]
+
+def test_flat_file_saves_sync_the_directory(flat_backend, monkeypatch):
+    """Test that each rename is made durable, once per batch"""
+    synced = []
+    monkeypatch.setattr(save_backends, "_fsync_directory", synced.append)
+    chars = [character_manager.create_character(f"Durable{i}", "Mage") for i in range(3)]
+
+    character_manager.save_character(chars[0])
+    assert synced == [flat_backend.directory]
+    with flat_backend.batch():
+        for char in chars:
+            character_manager.save_character(char)
+    assert synced == [flat_backend.directory] * 2
+
+def test_write_behind_coalesces_saves(flat_backend):
+    """Test that buffered saves are coalesced and written on flush"""
+    now = [0.0]
+    buffered = WriteBehindBackend(flat_backend, window=5.0, clock=lambda: now[0])
+    character_manager.set_save_backend(buffered)
+
+    char = character_manager.create_character("Buffered", "Rogue")
+    for gold in (110, 120, 130):
+        char['gold'] = gold
+        character_manager.save_character(char)
+
+    assert not flat_backend.exists("Buffered")
+    assert character_manager.load_character("Buffered")['gold'] == 130
+
+    character_manager.flush_saves()
+    assert flat_backend.exists("Buffered")
+
+    # Saves older than the window are written through automatically
+    char['gold'] = 140
+    character_manager.save_character(char)
+    now[0] = 6.0
+    character_manager.save_character(char)
+    saved = character_manager.deserialize_character(flat_backend.load("Buffered"))
+    assert saved['gold'] == 140
+
+def test_write_behind_flushes_at_exit(tmp_path):
+    """Test that a buffered save survives a process that never calls close()"""
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = (
+        "import character_manager, save_backends\n"
+        f"flat = save_backends.FlatFileBackend({str(tmp_path)!r})\n"
+        "buffered = save_backends.WriteBehindBackend(flat, window=60.0)\n"
+        "character_manager.set_save_backend(buffered)\n"
+        "character_manager.save_character(character_manager.create_character('Exit', 'Rogue'))\n"
+        "assert not flat.exists('Exit')\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=repo, check=True)
+
+    assert FlatFileBackend(str(tmp_path)).exists("Exit")
+
+# ============================================================================
+# INCREMENTAL SAVE TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("backend_fixture", ["flat_backend", "sqlite_backend"])
+def test_incremental_saves_journal_changes(backend_fixture, request):
+    """Test that incremental saves append deltas that replay on load"""
+    backend = request.getfixturevalue(backend_fixture)
+    char = character_manager.create_character("Delta", "Warrior")
+    char['completed_quests'] = [f"quest_{i}" for i in range(100)]
+    character_manager.save_character_incremental(char)
+    assert backend.read_journal("Delta") == []
+
+    char['gold'] = 150
+    char['completed_quests'].append("quest_100")
+    char['equipped_weapon'] = "iron_sword"
+    character_manager.save_character_incremental(char)
+    character_manager.save_character_incremental(char)  # nothing changed
+
+    journal = backend.read_journal("Delta")
+    assert len(journal) == 1
+    assert "quest_99" not in journal[0]
+
+    del char['equipped_weapon']
+    character_manager.save_character_incremental(char)
+
+    assert character_manager.load_character("Delta") == char
+
+def test_incremental_journal_compaction(flat_backend, monkeypatch):
+    """Test that the journal is folded into a full save at the threshold"""
+    monkeypatch.setattr(character_manager, "JOURNAL_COMPACT_THRESHOLD", 3)
+    char = character_manager.create_character("Compact", "Mage")
+    character_manager.save_character_incremental(char)
+
+    for gold in (101, 102):
+        char['gold'] = gold
+        character_manager.save_character_incremental(char)
+    assert len(flat_backend.read_journal("Compact")) == 2
+
+    char['gold'] = 103
+    character_manager.save_character_incremental(char)
+    assert flat_backend.read_journal("Compact") == []
+    assert character_manager.load_character("Compact")['gold'] == 103
+
+def test_incremental_state_is_kept_per_backend(flat_backend, tmp_path):
+    """Test that switching backends never turns a first save into a journal entry"""
+    other = FlatFileBackend(str(tmp_path / "other_saves"))
+    char = character_manager.create_character("Roamer", "Cleric")
+    character_manager.save_character_incremental(char)
+
+    character_manager.set_save_backend(other)
+    char['gold'] = 10
+    character_manager.save_character_incremental(char)
+    assert other.read_journal("Roamer") == []
+    assert character_manager.load_character("Roamer")['gold'] == 10
+
+    character_manager.set_save_backend(flat_backend)
+    char['gold'] = 20
+    character_manager.save_character_incremental(char)
+    assert len(flat_backend.read_journal("Roamer")) == 1
+    assert character_manager.load_character("Roamer")['gold'] == 20
+    assert "Roamer" in flat_backend.persisted and "Roamer" in other.persisted
+
+def test_write_behind_keeps_journal_until_save_is_written(flat_backend):
+    """Test that a buffered full save does not drop durable journal entries"""
+    char = character_manager.create_character("Durable", "Warrior")
+    character_manager.save_character_incremental(char)
+    char['gold'] = 500
+    character_manager.save_character_incremental(char)
+
+    buffered = WriteBehindBackend(flat_backend, window=60.0, clock=lambda: 0.0)
+    character_manager.set_save_backend(buffered)
+    char['gold'] = 600
+    character_manager.save_character(char)
+
+    # The inner backend still has the old save plus its journal
+    assert character_manager.load_character("Durable")['gold'] == 600
+    character_manager.set_save_backend(flat_backend)
+    assert character_manager.load_character("Durable")['gold'] == 500
+
+    buffered.flush()
+    assert flat_backend.read_journal("Durable") == []
+    assert character_manager.load_character("Durable")['gold'] == 600
+
+def test_failed_first_incremental_save_is_retried(flat_backend, monkeypatch):
+    """Test that a failed initial full save is not followed by journal-only saves"""
+    char = character_manager.create_character("Retry", "Mage")
+
+    def fail(name, data):
+        raise SaveFileCorruptedError("disk full")
+
+    monkeypatch.setattr(flat_backend, "save", fail)
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.save_character_incremental(char)
+    monkeypatch.undo()
+
+    char['gold'] = 5
+    character_manager.save_character_incremental(char)
+    assert flat_backend.read_journal("Retry") == []
+    assert character_manager.load_character("Retry")['gold'] == 5
+
+def test_torn_final_journal_line_is_ignored(flat_backend):
+    """Test that a half-written last journal entry does not break loading"""
+    char = character_manager.create_character("Torn", "Rogue")
+    character_manager.save_character_incremental(char)
+    char['gold'] = 175
+    character_manager.save_character_incremental(char)
+    flat_backend.append_journal("Torn", '{"set":{"gold":9')
+
+    assert character_manager.load_character("Torn")['gold'] == 175
+
+    character_manager.delete_character("Torn")
+    assert flat_backend.read_journal("Torn") == []
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])